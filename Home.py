@@ -1,5 +1,6 @@
 import streamlit as st
 import db_utils
+from scoring import SCORING_RULES, describe_points
 
 st.title("🏒 Fantasy College Hockey League")
 
@@ -8,30 +9,11 @@ st.write("Use the sidebar to navigate between pages.")
 
 st.subheader("Scoring Breakdown:")
 
-# List of stats and their points
-scoring = [
-    ("Goals", "2 pts each"),
-    ("Assists", "1 pt each"),
-    ("Shots", "0.1 pts each"),
-    ("Penalty minutes", "-0.3 pts each"),
-    ("Game Winning Goals", "1 pt each"),
-    ("Power Play Goals", "0.5 pts each"),
-    ("Short Handed Goals", "1 pts each"),
-    ("+/-", "0.5 pts each"),
-    ("Faceoffs Won", "0.1 pts each"),
-    ("Faceoffs Lost", "-0.1 pts each"),
-    ("Blocked Shots", "0.5 pts each"),
-    ("Wins (for goalies)", "4 pts each"),
-    ("Goals Against", "-2 pts each"),
-    ("Saves", "0.2 pts each"),
-    ("Shutouts", "3 pts each"),
-]
-
-# Loop through and display in two columns
-for stat, points in scoring:
+# Loop through the scoring rules and display in two columns
+for _, stat, points in SCORING_RULES:
     col1, col2 = st.columns([2, 1])  # wider first column
     col1.write(stat)
-    col2.write(points)
+    col2.write(describe_points(points))
 
 
 st.subheader("Rules:")
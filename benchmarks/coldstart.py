@@ -0,0 +1,123 @@
+# benchmarks/coldstart.py
+"""
+Where cold start time goes: import time of db_utils and of every page's
+imports (python -X importtime, in a fresh interpreter each), the prewarm's
+load time per dataset, and each page's first view with cold caches against
+the same view after a prewarm, on a synthetic league on the local backend.
+
+    python -m benchmarks.coldstart --latency 0.02
+    python -m benchmarks.coldstart --players 20000 --top 15 --out coldstart.json
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("FHL_BACKEND", "local")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import prewarm
+from benchmarks.run import REPO_DIR, _page, use_client
+from benchmarks.synthetic import make_league
+from local_backend import LocalClient
+
+PAGES = ["Home.py", *sorted(str(p.relative_to(REPO_DIR)) for p in (REPO_DIR / "pages").glob("*.py"))]
+
+# --- Import time ---
+def import_profile(modules, top=10):
+    """
+    Import modules in a fresh interpreter under -X importtime. Returns the
+    total microseconds and the `top` modules with the largest self time.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=REPO_DIR, capture_output=True, text=True, env={**os.environ, "FHL_PREWARM": "off"},
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    # Top-level imports are the ones without indentation
+    total = sum(cumulative for name, _, cumulative in rows if not name.startswith("  "))
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        "total_us": total,
+        "heaviest_self_us": {name.strip(): self_us for name, self_us, _ in heaviest},
+    }
+
+def page_imports(path):
+    """The modules a page script imports at its top level."""
+    tree = ast.parse((REPO_DIR / path).read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return modules
+
+# --- Data ---
+def first_views(league_data, latency, jitter):
+    """Each page's first view with cold caches, then after a prewarm."""
+    views = {}
+    for path in PAGES:
+        times = {}
+        for warm in (False, True):
+            client = LocalClient(league_data, latency=latency, jitter=jitter)
+            use_client(client)
+            if warm:
+                prewarm.run()
+            client.reset_stats()
+            start = time.perf_counter()
+            _page(path)()
+            label = "warm" if warm else "cold"
+            times[f"{label}_s"] = round(time.perf_counter() - start, 4)
+            times[f"{label}_round_trips"] = client.stats["round_trips"]
+        views[path] = times
+        print(f"{path:28} cold {times['cold_s'] * 1000:9.1f} ms {times['cold_round_trips']:5} trips"
+              f"   prewarmed {times['warm_s'] * 1000:9.1f} ms {times['warm_round_trips']:5} trips", file=sys.stderr)
+    return views
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--players", type=int, default=1800)
+    parser.add_argument("--weeks", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds per request")
+    parser.add_argument("--top", type=int, default=10, help="heaviest modules to list per import profile")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    imports = {"db_utils": import_profile(["db_utils"], args.top)}
+    for path in PAGES:
+        imports[path] = {"modules": page_imports(path), **import_profile(page_imports(path), args.top)}
+    for name, profile in imports.items():
+        print(f"import {name:28} {profile['total_us'] / 1000:9.1f} ms", file=sys.stderr)
+
+    league_data = make_league(teams=args.teams, players=args.players, weeks=args.weeks, seed=args.seed)
+    use_client(LocalClient(league_data, latency=args.latency, jitter=args.jitter))
+    loads = prewarm.run()
+    for name, seconds in loads.seconds.items():
+        print(f"prewarm {name:27} {seconds * 1000:9.1f} ms", file=sys.stderr)
+
+    report = json.dumps({
+        "params": vars(args),
+        "imports": imports,
+        "prewarm": {"seconds": loads.seconds, "errors": loads.errors},
+        "first_views": first_views(league_data, args.latency, args.jitter),
+    }, indent=1)
+    if args.out:
+        Path(args.out).write_text(report)
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# benchmarks/run.py
+"""
+Benchmarks for the db_utils loaders and writers, the league computations
+and the pages themselves, against a synthetic league on the local backend.
+
+    python -m benchmarks.run --teams 12 --players 1800 --latency 0.02 --out before.json
+    python -m benchmarks.run --teams 1000 --players 20000 --only loaders
+    python -m benchmarks.run --only loaders --error-rate 0.05 --repeat 10
+    python -m benchmarks.run --compare before.json after.json
+
+Every case reports its median wall time, peak Python memory (tracemalloc,
+from a separate run) and the round trips and rows the backend served.
+Caches are cleared before every run, so loaders are timed cold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("FHL_BACKEND", "local")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+import db_utils
+import league
+import pipeline
+import rosters
+from benchmarks.synthetic import make_league
+from local_backend import LocalClient
+from scoring import compute_fantasy_points
+from scraper import STATS_COLS
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+CASES = []
+
+def case(group):
+    """Register a benchmark. The function does untimed setup and returns the callable to time."""
+    def decorator(func):
+        CASES.append((group, func.__name__, func))
+        return func
+    return decorator
+
+def use_client(client):
+    """Point db_utils at client and drop everything cached from the previous one."""
+    db_utils.use_client(client)
+    db_utils.invalidate(*db_utils.CACHE_TTL)
+    db_utils.read_breaker.reset()
+    db_utils._players_sync.reset()
+    db_utils._draft_board_sync.reset()
+
+
+# --- Loaders ---
+@case("loaders")
+def load_teams(league_data):
+    return db_utils.load_teams
+
+@case("loaders")
+def load_players(league_data):
+    return db_utils.load_players
+
+@case("loaders")
+def load_players_incremental(league_data):
+    db_utils.load_players(incremental=True)
+    db_utils.get_client().table("players").update({"held_by": "Team 1"}).eq("Name", "Player 1").execute()
+    return lambda: db_utils.load_players(incremental=True)
+
+@case("loaders")
+def load_draft_board(league_data):
+    return db_utils.load_draft_board
+
+@case("loaders")
+def load_last_week_stats(league_data):
+    return db_utils.load_last_week_stats
+
+@case("loaders")
+def load_team_baseline(league_data):
+    return lambda: db_utils.load_team_baseline("college-1")
+
+@case("loaders")
+def load_points(league_data):
+    return db_utils.load_points
+
+@case("loaders")
+def load_matchups(league_data):
+    return db_utils.load_matchups
+
+@case("loaders")
+def load_roster(league_data):
+    return db_utils.load_roster
+
+@case("loaders")
+def load_player_week_points(league_data):
+    return db_utils.load_player_week_points
+
+@case("loaders")
+def load_player_season_points(league_data):
+    return db_utils.load_player_season_points
+
+@case("loaders")
+def load_week_scoped(league_data):
+    return lambda: (db_utils.load_roster(week=1), db_utils.load_player_week_points(week=1))
+
+@case("loaders")
+def load_team_scoped(league_data):
+    def run():
+        players = db_utils.load_players(columns=["Name", "team", "Pos.", "held_by"], held_by="Team 1")
+        keys = list(zip(players["Name"], players["team"]))
+        db_utils.load_player_week_points(week=db_utils.latest_week(), players=keys)
+        db_utils.load_player_season_points(players=keys)
+    return run
+
+
+# --- Writers ---
+@case("writers")
+def save_weekly_points(league_data):
+    day = pd.DataFrame(league_data["points"]).query("Week == 1 and Day == 1")
+    day = day[["Name", "team", "FantasyPoints"]].assign(FantasyPoints=day["FantasyPoints"] + 1)
+    return lambda: db_utils.save_weekly_points(day, 1, 1)
+
+@case("writers")
+def save_last_week_stats(league_data):
+    current = _current_stats(league_data)
+    return lambda: db_utils.save_last_week_stats(current)
+
+@case("writers")
+def save_player(league_data):
+    row = pd.Series(league_data["players"][0]).drop("updated_at")
+    row["held_by"] = "Team 1"
+    return lambda: db_utils.save_player(row)
+
+@case("writers")
+def update_draft_pick_full(league_data):
+    pick = league_data["DraftBoard"][0]
+    return lambda: db_utils.update_draft_pick_full(pick["Round"], pick["Pick"], "Player 1", "F",
+                                                   "college-1", pick["FantasyTeam"])
+
+@case("writers")
+def make_pick(league_data):
+    # Reopen the last pick so there is a pick to make
+    slot = league_data["DraftBoard"][-1]
+    db_utils.get_client().table("DraftBoard").update({"Name": None, "team": None, "Pos.": None}) \
+        .eq("Round", slot["Round"]).eq("Pick", slot["Pick"]).execute()
+    db_utils.get_client().table("players").update({"held_by": None}) \
+        .eq("Name", slot["Name"]).eq("team", slot["team"]).execute()
+    return lambda: db_utils.make_pick(slot["Round"], slot["Pick"], slot["FantasyTeam"], slot["Name"], slot["team"])
+
+@case("writers")
+def submit_roster(league_data):
+    rows = [{k: v for k, v in row.items() if k != "id"}
+            for row in league_data["active_roster"] if row["week"] == 1 and row["team_name"] == "Team 1"]
+    return lambda: db_utils.submit_roster(rows)
+
+@case("writers")
+def delete_prev_roster(league_data):
+    return lambda: db_utils.delete_prev_roster("Team 1", 1)
+
+@case("writers")
+def save_matchup_scores(league_data):
+    week = pd.DataFrame(league_data["matchups"]).query("week == 1")
+    week = week.assign(home_team_points=100.0, away_team_points=90.0)
+    return lambda: db_utils.save_matchup_scores(week)
+
+@case("writers")
+def save_weekly_matchups(league_data):
+    week = pd.DataFrame(league_data["matchups"]).query("week == 1")
+    return lambda: db_utils.save_weekly_matchups(week, 1)
+
+@case("writers")
+def save_standings(league_data):
+    standings = league.compute_standings(pd.DataFrame(league_data["matchups"]), pd.DataFrame(league_data["teams"]))
+    return lambda: db_utils.save_standings(standings)
+
+@case("writers")
+def update_team_record(league_data):
+    return lambda: db_utils.update_team_record("Team 1", W=3, L=2, PF=512.4, PA=488.1, Place=2)
+
+@case("writers")
+def add_team(league_data):
+    return lambda: db_utils.add_team("Expansion Team", "New Manager")
+
+@case("writers")
+def save_player_points(league_data):
+    weekly = pd.DataFrame(league_data["player_week_points"]).query("Week == 1")
+    season = pd.DataFrame(league_data["player_season_points"])
+    return lambda: db_utils.save_player_points(weekly, season)
+
+
+# --- League computations ---
+def _current_stats(league_data):
+    """The baseline one game later: every stat of every player moved a little."""
+    baseline = pd.DataFrame(league_data["last_week_stats"]).set_index(["Name", "team"])[STATS_COLS]
+    rng = np.random.default_rng(1)
+    return baseline + rng.poisson(0.3, baseline.shape)
+
+@case("compute")
+def weekly_diff(league_data):
+    current = _current_stats(league_data)
+    baseline = pd.DataFrame(league_data["last_week_stats"]).set_index(["Name", "team"])
+    return lambda: pipeline.diff_team(current, baseline)
+
+@case("compute")
+def fantasy_points(league_data):
+    weekly = pipeline.diff_team(_current_stats(league_data),
+                                pd.DataFrame(league_data["last_week_stats"]).set_index(["Name", "team"]))
+    return lambda: compute_fantasy_points(weekly)
+
+@case("compute")
+def player_point_totals(league_data):
+    points = pd.DataFrame(league_data["points"])
+    return lambda: league.player_point_totals(points)
+
+@case("compute")
+def score_matchups_week(league_data):
+    matchups = pd.DataFrame(league_data["matchups"]).query("week == 1")
+    rosters = pd.DataFrame(league_data["active_roster"]).query("week == 1")
+    week_points = pd.DataFrame(league_data["player_week_points"])
+    return lambda: league.score_matchups(matchups, rosters, week_points)
+
+@case("compute")
+def score_matchups_season(league_data):
+    matchups = pd.DataFrame(league_data["matchups"])
+    rosters = pd.DataFrame(league_data["active_roster"])
+    week_points = pd.DataFrame(league_data["player_week_points"])
+    return lambda: league.score_matchups(matchups, rosters, week_points)
+
+@case("compute")
+def compute_standings(league_data):
+    matchups, _ = league.score_matchups(pd.DataFrame(league_data["matchups"]),
+                                        pd.DataFrame(league_data["active_roster"]),
+                                        pd.DataFrame(league_data["player_week_points"]))
+    teams = pd.DataFrame(league_data["teams"])
+    return lambda: league.compute_standings(matchups, teams)
+
+@case("compute")
+def recompute_season(league_data):
+    tables = [pd.DataFrame(league_data[name]) for name in ("points", "active_roster", "matchups", "teams")]
+    return lambda: league.recompute_season(*tables)
+
+
+@case("compute")
+def build_rosters(league_data):
+    players = pd.DataFrame(league_data["players"])
+    return lambda: rosters.build_rosters(players, ["Name", "team", "Yr.", "Ht.", "Wt."])
+
+# --- Pages (whole script runs, roster building included) ---
+def _page(path, **session):
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        app = AppTest.from_file(str(REPO_DIR / path), default_timeout=600)
+        for key, value in session.items():
+            app.session_state[key] = value
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"{path} raised: {app.exception[0].value}")
+    return run
+
+@case("pages")
+def page_draft(league_data):
+    return _page("pages/2_Draft.py")
+
+@case("pages")
+def page_draft_idle(league_data):
+    """A Draft room rerun when nobody has picked since the last one."""
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(str(REPO_DIR / "pages/2_Draft.py"), default_timeout=600)
+    app.run()
+    return app.run
+
+@case("pages")
+def page_team(league_data):
+    return _page("pages/3_Team.py")
+
+@case("pages")
+def page_matchups(league_data):
+    return _page("pages/4_Matchups.py")
+
+@case("pages")
+def page_players(league_data):
+    return _page("pages/5_Players.py")
+
+@case("pages")
+def page_standings(league_data):
+    return _page("pages/6_Standings.py")
+
+
+# --- Runner ---
+def measure(prepare, league_data, latency, jitter, repeat, error_rate=0.0):
+    """Time one case `repeat` times on a fresh backend each, plus one traced run for memory."""
+    walls, stats = [], None
+    for traced in [False] * repeat + [True]:
+        client = LocalClient(league_data, latency=latency, jitter=jitter, error_rate=error_rate)
+        use_client(client)
+        run = prepare(league_data)
+        client.reset_stats()
+        if traced:
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            start = time.perf_counter()
+            run()
+            walls.append(time.perf_counter() - start)
+            stats = dict(client.stats)
+    return {
+        "wall_s": statistics.median(walls),
+        "wall_s_min": min(walls),
+        "wall_s_max": max(walls),
+        "runs": repeat,
+        "peak_mib": round(peak / 2 ** 20, 3),
+        "round_trips": stats.get("round_trips", 0),
+        "rows_returned": stats.get("rows_returned", 0),
+        "read_errors": stats.get("read_errors", 0),
+    }
+
+def run_benchmarks(params, latency=0.0, jitter=0.0, repeat=3, only=None, error_rate=0.0):
+    league_data = make_league(**params)
+    results = []
+    for group, name, prepare in CASES:
+        if only and not any(word in (group, name) or word in name for word in only):
+            continue
+        try:
+            result = measure(prepare, league_data, latency, jitter, repeat, error_rate)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        results.append({"group": group, "name": name, **result})
+        print(f"{group:8} {name:28} " + (f"{result['wall_s'] * 1000:10.1f} ms {result['round_trips']:6} trips"
+                                         f" {result['peak_mib']:9.1f} MiB" if "error" not in result else result["error"]),
+              file=sys.stderr)
+    return {
+        "params": {**params, "latency": latency, "jitter": jitter, "error_rate": error_rate, "repeat": repeat},
+        "environment": {"python": platform.python_version(), "pandas": pd.__version__,
+                        "numpy": np.__version__, "machine": platform.machine()},
+        "results": results,
+    }
+
+def compare(before_path, after_path):
+    """Print wall time and round trips of two result files side by side."""
+    before, after = (json.loads(Path(p).read_text()) for p in (before_path, after_path))
+    old = {(r["group"], r["name"]): r for r in before["results"]}
+    print(f"{'case':38} {'before ms':>10} {'after ms':>10} {'speedup':>8} {'trips':>13}")
+    for r in after["results"]:
+        b = old.get((r["group"], r["name"]))
+        if not b or "error" in b or "error" in r:
+            continue
+        speedup = b["wall_s"] / r["wall_s"] if r["wall_s"] else float("inf")
+        print(f"{r['group'] + '/' + r['name']:38} {b['wall_s'] * 1000:10.1f} {r['wall_s'] * 1000:10.1f}"
+              f" {speedup:7.2f}x {b['round_trips']:6}>{r['round_trips']:<6}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--players", type=int, default=1800)
+    parser.add_argument("--college-teams", type=int, default=60)
+    parser.add_argument("--weeks", type=int, default=15)
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--roster-size", type=int, default=17)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of reads that fail with a ReadError")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="groups or case names (substrings) to run")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two reports")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare)
+
+    params = {"teams": args.teams, "players": args.players, "college_teams": args.college_teams,
+              "weeks": args.weeks, "days": args.days, "roster_size": args.roster_size, "seed": args.seed}
+    report = json.dumps(run_benchmarks(params, args.latency, args.jitter, args.repeat, args.only,
+                                             args.error_rate), indent=1)
+    if args.out:
+        Path(args.out).write_text(report)
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
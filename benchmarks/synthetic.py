@@ -0,0 +1,115 @@
+# benchmarks/synthetic.py
+"""
+Synthetic leagues of any size, as table rows for local_backend.LocalClient.
+Every table has the columns the real one has; the numbers are random but
+seeded, so two runs with the same parameters see the same league.
+"""
+import numpy as np
+import pandas as pd
+
+import league
+from rosters import ROSTER_TEMPLATE
+from scraper import STATS_COLS
+
+POSITIONS = ["F", "D", "G"]
+POSITION_SHARE = [0.6, 0.3, 0.1]
+
+def make_league(teams=12, players=1800, college_teams=60, weeks=15, days=4, roster_size=17, seed=0):
+    """
+    A whole season: `teams` fantasy teams with `roster_size` players each,
+    drawn from `players` college players on `college_teams` teams, with
+    points for every player on every day of `weeks` weeks, a lineup per team
+    per week and a round-robin schedule. Returns {table: rows}.
+    """
+    rng = np.random.default_rng(seed)
+    team_names = [f"Team {i + 1}" for i in range(teams)]
+
+    # --- Players ---
+    roster = pd.DataFrame({
+        "Name": [f"Player {i + 1}" for i in range(players)],
+        "Yr.": rng.choice(["Fr", "So", "Jr", "Sr", "Gr"], players),
+        "Pos.": rng.choice(POSITIONS, players, p=POSITION_SHARE),
+        "Ht.": [f"{h // 12}-{h % 12}" for h in rng.integers(68, 78, players)],
+        "Wt.": rng.integers(160, 230, players),
+        "YOB": rng.integers(2000, 2007, players),
+        "Hometown": "Somewhere, Minn.",
+        "Last Team": "Somewhere (USHL)",
+        "team": [f"college-{i % college_teams + 1}" for i in range(players)],
+        "held_by": None,
+        "Draft Year": " ",
+        "Draft Team": " ",
+        "Draft Round": rng.choice(["-", "1", "2", "3", "4", "5", "6", "7"], players),
+    })
+    drafted = rng.permutation(players)[:min(players, teams * roster_size)]
+    roster.loc[drafted, "held_by"] = [team_names[i % teams] for i in range(len(drafted))]
+
+    # --- Draft board: snake order, filled in pick order ---
+    board = []
+    for round_number in range(1, roster_size + 1):
+        order = team_names if round_number % 2 else team_names[::-1]
+        for pick, fantasy_team in enumerate(order, start=1):
+            board.append({"Round": round_number, "Pick": pick, "FantasyTeam": fantasy_team,
+                          "Name": None, "team": None, "Pos.": None})
+    for slot, i in zip(board, drafted):
+        slot.update(Name=roster.at[i, "Name"], team=roster.at[i, "team"], **{"Pos.": roster.at[i, "Pos."]})
+
+    # --- Points: every player, every day ---
+    n = players * weeks * days
+    points = pd.DataFrame({
+        "Name": np.tile(roster["Name"].to_numpy(), weeks * days),
+        "team": np.tile(roster["team"].to_numpy(), weeks * days),
+        "Week": np.repeat(np.arange(1, weeks + 1), players * days),
+        "Day": np.tile(np.repeat(np.arange(1, days + 1), players), weeks),
+        "FantasyPoints": np.round(rng.gamma(0.6, 2.0, n) - 0.3, 1),
+    })
+    weekly, season = league.player_point_totals(points)
+
+    # --- Baseline: cumulative stats for the current snapshot ---
+    baseline = pd.DataFrame(rng.poisson(3, (players, len(STATS_COLS))).astype(float), columns=STATS_COLS)
+    baseline.insert(0, "Name", roster["Name"])
+    baseline["team"] = roster["team"]
+    baseline["valid_from"] = 0
+    baseline["valid_to"] = None
+
+    # --- Schedule: circle-method round robin, repeated ---
+    matchups = []
+    slots = team_names + ([None] if teams % 2 else [])
+    for week in range(1, weeks + 1):
+        turn = (week - 1) % (len(slots) - 1)
+        rotated = slots[:1] + (slots[1:][-turn:] + slots[1:][:-turn] if turn else slots[1:])
+        half = len(rotated) // 2
+        for home, away in zip(rotated[:half], reversed(rotated[half:])):
+            if home and away:
+                matchups.append({"week": week, "home_team": home, "away_team": away,
+                                 "home_team_points": None, "away_team_points": None})
+
+    # --- Lineups: every team's first slots start, the rest sit ---
+    held = roster.dropna(subset=["held_by"])
+    starters = held.groupby(["held_by", "Pos."]).cumcount() < held["Pos."].map(ROSTER_TEMPLATE)
+    lineup = pd.DataFrame({
+        "team_name": held["held_by"],
+        "player_name": held["Name"],
+        "player_pos": np.where(starters, "starter", "bench"),
+        "Pos.": held["Pos."],
+        "team": held["team"],
+    })
+    active_roster = pd.concat([lineup.assign(week=week) for week in range(1, weeks + 1)], ignore_index=True)
+    active_roster.insert(0, "id", np.arange(1, len(active_roster) + 1))
+
+    stamp = pd.Timestamp("2026-01-01", tz="UTC").isoformat()
+    tables = {
+        "players": roster.assign(updated_at=stamp),
+        "points": points,
+        "last_week_stats": baseline,
+        "snapshots": pd.DataFrame([{"name": "last_week_stats", "version": 0, "staged_by": None, "staged_at": None},
+                                   {"name": "draft", "version": 0, "staged_by": None, "staged_at": None}]),
+        "matchups": pd.DataFrame(matchups),
+        "DraftBoard": pd.DataFrame(board).assign(updated_at=stamp),
+        "teams": pd.DataFrame({"team_name": team_names, "manager": [f"Manager {i + 1}" for i in range(teams)],
+                               "W": 0, "L": 0, "PF": 0.0, "PA": 0.0, "Place": 0}),
+        "active_roster": active_roster,
+        "player_week_points": weekly,
+        "player_season_points": season,
+    }
+    return {name: df.astype(object).where(df.notna(), None).to_dict(orient="records")
+            for name, df in tables.items()}
@@ -1,187 +1,1055 @@
 # db_utils.py
-from supabase import create_client
+from supabase import ClientOptions, create_client
 import streamlit as st
 import pandas as pd
+import os
+import random
 import time
+import functools
+import uuid
+import importlib.util
+import threading
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date
+import httpx
 from httpx import ReadError
+from postgrest.exceptions import APIError
+import metrics
+from scoring import SCORED_STATS
 
-url = st.secrets["SUPABASE_URL"]
-key = st.secrets["SUPABASE_KEY"]
-supabase = create_client(url, key)
+def setting(name, default=None):
+    """A config value: the FHL_<name> environment variable, else st.secrets[name], else default."""
+    value = os.environ.get(f"FHL_{name}")
+    if value is not None:
+        return value
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        return default
 
+# --- Backend: the hosted Supabase project, or BACKEND = "local" for the
+# in-process stand-in seeded from the repo CSVs (see local_backend.py) ---
+BACKEND = setting("BACKEND", "supabase")
+
+# --- HTTP connection pool for the hosted project ---
+# One httpx client serves every thread and session, so the many small
+# .range() requests of a render reuse kept-alive connections; with h2
+# installed they are HTTP/2 and parallel windows multiplex over one socket.
+HTTP2 = importlib.util.find_spec("h2") is not None
+HTTP_MAX_CONNECTIONS = int(setting("HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE = int(setting("HTTP_MAX_KEEPALIVE", 10))
+HTTP_KEEPALIVE_EXPIRY = float(setting("HTTP_KEEPALIVE_EXPIRY", 60))
+HTTP_TIMEOUT = float(setting("HTTP_TIMEOUT", 30))
+HTTP_CONNECT_TIMEOUT = float(setting("HTTP_CONNECT_TIMEOUT", 10))
+
+class ConnectionStats:
+    """
+    Requests and connections seen by the pooled client. A response on a
+    network stream seen before came over a reused connection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = weakref.WeakSet()
+        self.counts = Counter()
+
+    def observe(self, response):
+        stream = response.extensions.get("network_stream")
+        version = response.extensions.get("http_version", b"").decode() or "unknown"
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts[version] += 1
+            if stream is not None and stream not in self._streams:
+                self._streams.add(stream)
+                self.counts["connections"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        requests, connections = counts.pop("requests", 0), counts.pop("connections", 0)
+        return {
+            "requests": requests,
+            "connections": connections,
+            "reused": requests - connections,
+            "reuse_ratio": round((requests - connections) / requests, 3) if requests else None,
+            "http_versions": counts,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._streams.clear()
+            self.counts.clear()
+
+connection_stats = ConnectionStats()
+
+def _count_response(response):
+    # Read here so the size is known; the PostgREST client reuses the read body
+    response.read()
+    metrics.count(round_trips=1, bytes=len(response.content))
+
+def _http_client() -> httpx.Client:
+    return httpx.Client(
+        http2=HTTP2,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        event_hooks={"response": [connection_stats.observe, _count_response]},
+    )
+
+def _create_client():
+    if BACKEND == "local":
+        import local_backend
+        return local_backend.LocalClient.from_csvs(
+            setting("LOCAL_DATA", local_backend.DATA_DIR),
+            latency=float(setting("LOCAL_LATENCY", 0)),
+            jitter=float(setting("LOCAL_JITTER", 0)),
+            error_rate=float(setting("LOCAL_ERROR_RATE", 0)),
+        )
+    # The pool is handed to the PostgREST client (table() and rpc()), the only
+    # part of the client the app uses; storage and functions would re-point it.
+    return create_client(setting("SUPABASE_URL"), setting("SUPABASE_KEY"),
+                         options=ClientOptions(httpx_client=_http_client()))
+
+# --- Shared client, created on first use ---
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """The backend client, created on first use and shared by every thread and session."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+def use_client(client):
+    """Serve every later request from client instead (e.g. a LocalClient in benchmarks)."""
+    global _client
+    with _client_lock:
+        _client = client
+
+# --- Instrumentation: spans to a rotating JSONL file, /metrics on
+# METRICS_PORT, and the developer panel (see metrics.py) ---
+metrics.configure(setting("METRICS_FILE", ".cache/metrics/spans.jsonl"),
+                  max_bytes=int(setting("METRICS_MAX_BYTES", 5_000_000)),
+                  backups=int(setting("METRICS_BACKUPS", 3)))
+if setting("METRICS_PORT") and st.runtime.exists():
+    metrics.serve(int(setting("METRICS_PORT")))
+metrics.watch_connections(connection_stats)
+DEV_PANEL = setting("DEV_PANEL", "off") == "on"
+
+# --- Pagination settings for the large tables ---
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+
+# --- Read retries ---
+READ_RETRIES = 4         # attempts per request
+READ_BACKOFF = 0.25      # seconds: the longest first wait, doubled each retry (full jitter)
+READ_BACKOFF_CAP = 4.0   # no single wait is longer than this
+READ_DEADLINE = 30.0     # no retry is started this many seconds after a read began
+BREAKER_THRESHOLD = 5    # failed requests in a row that open the circuit
+BREAKER_COOLDOWN = 15.0  # seconds it stays open before a trial request
+RESUME_MAX_AGE = 60.0    # seconds an incomplete read's windows can be resumed from
+
+# Failures a retry can clear: the network, PostgREST losing its database
+# connection, a statement timeout, and serialization failures or deadlocks.
+_READ_RETRYABLE_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "57014", "40001", "40P01"}
+
+def _retryable(error):
+    if isinstance(error, httpx.TransportError):
+        return True
+    return isinstance(error, APIError) and error.code in _READ_RETRYABLE_CODES
+
+class CircuitOpen(Exception):
+    """Raised instead of sending a read while the circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Fails reads fast while the backend keeps failing: after `threshold` failed
+    requests in a row it opens for `cooldown` seconds, then lets one trial
+    request through and closes if it succeeds or opens again if not.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether the request about to be sent is the trial; raises CircuitOpen if none may go."""
+        with self._lock:
+            if self.opened_at is None:
+                return False
+            if not self._trial and time.monotonic() - self.opened_at >= self.cooldown:
+                self._trial = True
+                return True
+            raise CircuitOpen(f"{self.failures} reads failed in a row; backing off for {self.cooldown:.0f}s")
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self.failures, self.opened_at = 0, None
+            else:
+                self.failures += 1
+                if self._trial or self.failures >= self.threshold:
+                    self.opened_at = time.monotonic()
+            self._trial = False
+
+    def reset(self):
+        self.record(True)
+
+read_breaker = CircuitBreaker()
+
+@dataclass
+class RetryPolicy:
+    attempts: int = READ_RETRIES
+    backoff: float = READ_BACKOFF
+    cap: float = READ_BACKOFF_CAP
+
+    def wait(self, attempt) -> float:
+        """Seconds to sleep before retry number attempt + 1: full jitter up to the capped exponential."""
+        return random.uniform(0, min(self.cap, self.backoff * 2 ** attempt))
+
+def _execute(query, policy=None, deadline=None):
+    """
+    Execute a read, retrying transient failures with backoff and jitter until
+    the policy's attempts or the deadline (a time.monotonic() value) run out.
+    Other errors are raised at once; CircuitOpen while the breaker is open.
+    """
+    policy = policy or RetryPolicy()
+    deadline = deadline or time.monotonic() + READ_DEADLINE
+    for attempt in range(policy.attempts):
+        trial = read_breaker.allow()
+        recorded = False
+        try:
+            response = query.execute()
+        except Exception as e:
+            if not _retryable(e):
+                raise
+            read_breaker.record(False)
+            recorded = True
+            wait = policy.wait(attempt)
+            if attempt == policy.attempts - 1 or time.monotonic() + wait > deadline:
+                raise
+            metrics.count(retries=1)
+            time.sleep(wait)
+        else:
+            read_breaker.record(True)
+            recorded = True
+            metrics.count(rows=len(response.data) if isinstance(response.data, list) else 1)
+            return response
+        finally:
+            # A trial that ends any other way (a non-transient error, an
+            # interrupt) still fails, or the breaker would wait on it forever
+            if trial and not recorded:
+                read_breaker.record(False)
+
+# --- Process-wide read cache, shared by every session ---
+# Seconds each table's loaders may serve cached data; writes clear it early.
+CACHE_TTL = {
+    "teams": 60,
+    "players": 30,
+    "DraftBoard": 5,
+    "last_week_stats": 600,
+    "points": 300,
+    "matchups": 300,
+    "active_roster": 60,
+    "player_week_points": 300,
+    "player_season_points": 300,
+    "draft_version": 2,
+}
+CACHE_MAX_ENTRIES = 16
+_table_loaders = {}
+
+def cached(table):
+    """Cache a loader for all sessions with the table's TTL, bounded to CACHE_MAX_ENTRIES."""
+    def decorator(func):
+        loader = st.cache_data(ttl=CACHE_TTL[table], max_entries=CACHE_MAX_ENTRIES, show_spinner=False)(func)
+        _table_loaders.setdefault(table, []).append(loader)
+        return metrics.traced(table)(loader)
+    return decorator
+
+def invalidate(*tables):
+    """Drop every cached read of the given tables, and any incomplete read to resume."""
+    for table in tables:
+        for loader in _table_loaders.get(table, []):
+            loader.clear()
+        # (last_week_stats is read through a view named after it)
+        for key in [key for key in list(_incomplete) if key[0].startswith(table)]:
+            _incomplete.pop(key, None)
+
+def invalidates(*tables):
+    """Clear the cached reads of the given tables once the write returns (or fails)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate(*tables)
+        return metrics.traced(",".join(tables))(wrapper)
+    return decorator
+
+# --- Frame schemas ---
+# Per table: low-cardinality labels load as categoricals and the raw stat
+# columns of the stats tables as float32; any other column keeps the type its
+# JSON gave it. Keyed by table, since the same name can mean different
+# things (teams.W is a win count, last_week_stats.W goalie wins).
+def _schema(categories=(), float32=()):
+    return {**dict.fromkeys(categories, "category"), **dict.fromkeys(float32, "float32")}
+
+SCHEMAS = {
+    "players": _schema(["team", "Pos.", "held_by"]),
+    "DraftBoard": _schema(["team", "Pos.", "FantasyTeam"]),
+    "last_week_stats": _schema(["team"], SCORED_STATS),
+    "points": _schema(["team"]),
+    "player_week_points": _schema(["team"]),
+    "player_season_points": _schema(["team"]),
+    "active_roster": _schema(["team"]),
+}
+
+def typed(df: pd.DataFrame, table) -> pd.DataFrame:
+    """Apply table's frame schema to whichever of its columns df has."""
+    dtypes = {col: dtype for col, dtype in SCHEMAS.get(table, {}).items() if col in df.columns}
+    return df.astype(dtypes) if dtypes else df
+
+def _frame(rows, table, columns=None, empty_columns=None):
+    """A typed frame of table's JSON rows; with no rows it still has the expected columns."""
+    return typed(pd.DataFrame(rows, columns=None if rows else columns or empty_columns), table)
+
+def _select_list(columns=None):
+    """A PostgREST select list. Names are quoted since several contain '.', ' ' or '/'."""
+    return ",".join(f'"{col}"' for col in columns) if columns else "*"
+
+# --- Filter pushdown ---
+def scope_filters(week=None, weeks=None, week_column="Week", players=None, **equals):
+    """
+    Query predicates for a scoped read: one week, an inclusive (first, last)
+    range of weeks, a list of (Name, team) players and equality on any other
+    column. Arguments left as None do not filter.
+    """
+    filters = []
+    if week is not None:
+        filters.append(("eq", week_column, week))
+    if weeks is not None:
+        filters += [("gte", week_column, weeks[0]), ("lte", week_column, weeks[1])]
+    if players is not None:
+        filters.append(("in_", "Name", sorted({name for name, _ in players})))
+    filters += [("eq", column, value) for column, value in equals.items() if value is not None]
+    return filters
+
+def _only_players(df, players):
+    """Rows of df for exactly these (Name, team) pairs; Name alone was pushed down."""
+    if players is None or df.empty:
+        return df
+    return df[pd.MultiIndex.from_frame(df[["Name", "team"]].astype(object)).isin(list(players))].reset_index(drop=True)
+
+def _filtered(query, filters):
+    """
+    Apply (method, column, value) filters, e.g. ("eq", "Week", 3), to a query.
+    Methods without a column, such as or_, take (method, None, value).
+    """
+    for method, column, value in filters:
+        query = getattr(query, method)(value) if column is None else getattr(query, method)(column, value)
+    return query
+
+# Key of each paginated table (or view). Windows are ordered by it: without an
+# order PostgREST may return rows in any order, so offset windows could
+# overlap or leave gaps between them.
+PAGE_ORDER = {
+    "players": ["Name", "team"],
+    "DraftBoard": ["Round", "Pick"],
+    "last_week_stats": ["Name", "team", "valid_from"],
+    "points": ["Name", "team", "Week", "Day"],
+    "player_week_points": ["Name", "team", "Week"],
+    "player_season_points": ["Name", "team"],
+}
+
+def _fetch_window(table, start, end, policy, deadline, filters=(), columns=None):
+    """Fetch rows start..end (inclusive) of a table, in PAGE_ORDER."""
+    query = _filtered(get_client().table(table).select(_select_list(columns)), filters)
+    for column in PAGE_ORDER[table]:
+        query = query.order(column)
+    return _execute(query.range(start, end), policy, deadline).data
+
+def _newest_stamp(table, policy=None, deadline=None):
+    query = get_client().table(table).select("updated_at").order("updated_at", desc=True).limit(1)
+    data = _execute(query, policy, deadline).data
+    return data[0]["updated_at"] if data else None
+
+# What tells whether a table changed, for the tables whose incomplete reads
+# may be resumed. Every write stamps updated_at (or moves the baseline
+# version), and a delete changes the count, so pages read under the same
+# count and version still line up with fresh ones. Other tables start over.
+RESUME_VERSIONS = {
+    "players": functools.partial(_newest_stamp, "players"),
+    "DraftBoard": functools.partial(_newest_stamp, "DraftBoard"),
+    "last_week_stats": lambda policy=None, deadline=None: baseline_version(),
+}
+
+class IncompleteRead(Exception):
+    """
+    A paginated read that could not get every row. .pages holds the windows
+    that did arrive (start row -> rows); the next read of the same rows
+    resumes from them within RESUME_MAX_AGE, if the table's row count and
+    version (RESUME_VERSIONS) have not changed, instead of starting over.
+    """
+
+    def __init__(self, table, expected, pages, missing, batch_size, cause=None, version=None):
+        received = sum(len(rows) for rows in pages.values())
+        super().__init__(f"{table}: read {received} of {expected} rows, {len(missing)} windows missing"
+                         + (f" ({cause!r})" if cause else ""))
+        self.table = table
+        self.expected = expected
+        self.pages = pages
+        self.missing = missing
+        self.batch_size = batch_size
+        self.version = version
+        self.at = time.monotonic()
+
+# Incomplete reads by (table, filters, columns, batch size), for the next read to resume
+_incomplete = {}
+
+def fetch_paginated(table, batch_size=PAGE_SIZE, max_workers=MAX_WORKERS, max_retries=READ_RETRIES,
+                    delay=READ_BACKOFF, filters=(), columns=None):
+    """
+    Fetch a whole table (or the rows matching filters) in parallel .range() windows,
+    only the given columns if any.
+    Gets the row count first, plans every window, fetches them on a bounded
+    thread pool and returns the rows in table order. Each window is retried
+    on its own (max_retries attempts, backoff from delay seconds). If any
+    window still fails, or fewer rows arrive than the count promised, raises
+    IncompleteRead rather than return part of the table.
+    """
+    policy = RetryPolicy(max_retries, delay)
+    deadline = time.monotonic() + READ_DEADLINE
+    key = (table, tuple(map(str, filters)), tuple(columns or ()), batch_size)
+    previous = _incomplete.pop(key, None)
+    # Read before the count, so a write during the read moves it for the next one
+    version = RESUME_VERSIONS[table](policy, deadline) if table in RESUME_VERSIONS else None
+
+    count_query = _filtered(get_client().table(table).select("*", count="exact", head=True), filters)
+    total = _execute(count_query, policy, deadline).count or 0
+    resume = (previous is not None and version is not None and time.monotonic() - previous.at < RESUME_MAX_AGE
+              and (previous.expected, previous.version) == (total, version))
+    pages = previous.pages if resume else {}
+    windows = [(start, start + batch_size - 1) for start in range(0, total, batch_size) if start not in pages]
+
+    def fetch(window):
+        try:
+            return window[0], _fetch_window(table, *window, policy, deadline, filters, columns), None
+        except Exception as e:
+            if not (_retryable(e) or isinstance(e, CircuitOpen)):
+                raise
+            return window[0], None, e
+
+    failures = {}
+    if windows:
+        workers = max(1, min(max_workers, len(windows)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for start, rows, error in pool.map(metrics.bind(fetch), windows):
+                if error is None:
+                    pages[start] = rows
+                else:
+                    failures[start] = error
+
+    # Rows inserted after the count was taken: keep reading past the plan
+    start = -(-total // batch_size) * batch_size
+    while not failures and (start == 0 or len(pages.get(start - batch_size, ())) == batch_size):
+        _, rows, error = fetch((start, start + batch_size - 1))
+        if error is not None:
+            failures[start] = error
+        elif rows:
+            pages[start] = rows
+        if not rows:
+            break
+        start += batch_size
+
+    # Complete means no window failed, every window but the last came back
+    # full (a short one was cut off, e.g. by a server row cap) and at least
+    # the counted rows arrived
+    starts = sorted(pages)
+    short = [s for s in starts[:-1] if len(pages[s]) < batch_size]
+    received = sum(len(rows) for rows in pages.values())
+    if failures or short or received < total:
+        error = IncompleteRead(table, total, pages, sorted(failures) + short, batch_size,
+                               next(iter(failures.values()), None), version)
+        for s in short:
+            del pages[s]
+        _incomplete[key] = error
+        raise error
+    return [row for s in starts for row in pages[s]]
+
+# --- Bulk writes ---
+WRITE_CHUNK_SIZE = 500
+WRITE_WORKERS = 4
+WRITE_RETRIES = 3
+WRITE_BACKOFF = 0.5  # seconds before the first retry, doubled each time
+
+# An upsert can always be replayed. An insert is only replayed when the
+# request never reached the server, or a retry could duplicate rows.
+_UPSERT_RETRYABLE = (httpx.TransportError,)
+_INSERT_RETRYABLE = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+@dataclass
+class WriteSummary:
+    table: str
+    rows: int = 0
+    chunks: int = 0
+    retried_chunks: int = 0
+    retries: int = 0
+    errors: list = field(default_factory=list)
+
+class BulkWriteError(Exception):
+    """Raised when chunks still failed after their retries; .summary says what landed."""
+
+    def __init__(self, summary):
+        super().__init__(f"{len(summary.errors)} of {summary.chunks} chunks to {summary.table} failed: {summary.errors[0]!r}")
+        self.summary = summary
+
+def bulk_write(table, records, op="upsert", chunk_size=WRITE_CHUNK_SIZE, max_workers=WRITE_WORKERS,
+               max_retries=WRITE_RETRIES, backoff=WRITE_BACKOFF, **options) -> WriteSummary:
+    """
+    Insert or upsert records in chunks submitted in parallel; op="rpc" calls
+    the database function named `table` with each chunk as p_rows (it must be
+    safe to replay, like an upsert).
+    Each chunk is retried on its own with exponential backoff; extra options
+    (e.g. on_conflict) go to the query builder. Returns a WriteSummary, or
+    raises BulkWriteError if any chunk never succeeded.
+    """
+    retryable = _INSERT_RETRYABLE if op == "insert" else _UPSERT_RETRYABLE
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    summary = WriteSummary(table, chunks=len(chunks))
+
+    def send(chunk):
+        if op == "rpc":
+            return get_client().rpc(table, {"p_rows": chunk}).execute()
+        return getattr(get_client().table(table), op)(chunk, returning="minimal", **options).execute()
+
+    def write_chunk(chunk):
+        for attempt in range(max_retries + 1):
+            try:
+                send(chunk)
+                return attempt, None
+            except retryable as e:
+                if attempt == max_retries:
+                    return attempt, e
+                metrics.count(retries=1)
+                time.sleep(backoff * 2 ** attempt)
+            except Exception as e:
+                return attempt, e
+
+    if chunks:
+        workers = max(1, min(max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk, (retries, error) in zip(chunks, pool.map(metrics.bind(write_chunk), chunks)):
+                summary.retries += retries
+                summary.retried_chunks += retries > 0
+                if error is None:
+                    summary.rows += len(chunk)
+                else:
+                    summary.errors.append(error)
+
+    if summary.errors:
+        raise BulkWriteError(summary)
+    return summary
+
+# --- Incremental (delta) sync ---
+# Re-read rows stamped this long before the watermark, in case a slower
+# transaction committed a row with an older updated_at.
+SYNC_OVERLAP = pd.Timedelta(seconds=5)
+# More changed rows than this in one sync and a full reload is cheaper.
+SYNC_MAX_CHANGES = 500
+
+class DeltaSync:
+    """
+    Keeps a process-wide copy of a table current using its updated_at watermark.
+    Each sync fetches only the rows changed since the last one and merges them
+    in by key. The table is reloaded in full only when there is no watermark,
+    the columns change, too many rows changed at once, or the server counts
+    a different number of rows than the copy holds (rows were deleted).
+    """
+
+    def __init__(self, table, key):
+        self.table = table
+        self.key = key
+        self.frame = None
+        self.watermark = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.frame = None
+            self.watermark = None
+
+    def sync(self) -> pd.DataFrame:
+        with self._lock:
+            if self.frame is None or self.watermark is None:
+                self._full_reload()
+            else:
+                self._apply_changes()
+                # A deleted row leaves no updated_at to sync from
+                if self._count() != len(self.frame):
+                    self._full_reload()
+            return self.frame.copy()
+
+    def _count(self):
+        return _execute(get_client().table(self.table).select("*", count="exact", head=True)).count
+
+    def _full_reload(self):
+        self.frame = pd.DataFrame(fetch_paginated(self.table))
+        self.watermark = _latest_update(self.frame)
+
+    def _apply_changes(self):
+        since = self.watermark - SYNC_OVERLAP
+        stamps = pd.to_datetime(self.frame["updated_at"], utc=True, format="ISO8601")
+        if (stamps >= since).sum() < SYNC_MAX_CHANGES // 2:
+            # Re-read the overlap along with the changes, in one request
+            return self._merge(self._changed("gte", since))
+
+        # Too many rows share the overlap (e.g. a bulk load) to re-read it on
+        # every sync: take the rows past the watermark, then re-read the
+        # overlap only if the server counts rows in it that we do not have
+        watermark = self.watermark
+        if self._merge(self._changed("gt", watermark)):
+            return
+        stamps = pd.to_datetime(self.frame["updated_at"], utc=True, format="ISO8601")
+        local = int(((stamps >= since) & (stamps <= watermark)).sum())
+        server = _execute(
+            get_client().table(self.table).select("*", count="exact", head=True)
+            .gte("updated_at", since.isoformat()).lte("updated_at", watermark.isoformat())
+        ).count
+        if server != local:
+            self._merge(self._changed("gte", since))
+
+    def _changed(self, op, since):
+        return _execute(
+            getattr(get_client().table(self.table).select("*"), op)("updated_at", since.isoformat())
+            .order("updated_at")
+            .limit(SYNC_MAX_CHANGES)
+        ).data
+
+    def _merge(self, rows):
+        """Merge changed rows in by key; True if that took a full reload instead."""
+        if not rows:
+            return False
+        changes = pd.DataFrame(rows)
+        if len(rows) >= SYNC_MAX_CHANGES or set(changes.columns) != set(self.frame.columns):
+            self._full_reload()
+            return True
+
+        base = self.frame.set_index(self.key)
+        if not base.index.is_unique:
+            self._full_reload()
+            return True
+        changes = changes.set_index(self.key)[base.columns]
+        changes = changes[~changes.index.duplicated(keep="last")]
+        existing = changes.index.isin(base.index)
+        base.loc[changes.index[existing]] = changes[existing]
+        self.frame = pd.concat([base, changes[~existing]]).reset_index()
+        self.watermark = max(self.watermark, _latest_update(changes))
+        return False
+
+def _latest_update(df):
+    """Newest updated_at in a frame, or None when the column is missing."""
+    if "updated_at" not in df.columns or df.empty:
+        return None
+    return pd.to_datetime(df["updated_at"], utc=True, format="ISO8601").max()
+
+_players_sync = DeltaSync("players", ["Name", "team"])
+_draft_board_sync = DeltaSync("DraftBoard", ["Round", "Pick"])
+
+@metrics.traced("teams")
 def get_team_by_name(team_name: str):
     """Return team row if it exists, otherwise None."""
-    response = supabase.table("teams").select("*").eq("team_name", team_name).execute()
+    response = _execute(get_client().table("teams").select("*").eq("team_name", team_name))
     if response.data:
         return response.data[0]
     return None
 
+@invalidates("teams")
 def add_team(team_name: str, manager: str):
     """Insert a new team into the database."""
-    supabase.table("teams").insert({
+    get_client().table("teams").insert({
         "team_name": team_name,
         "manager": manager
     }).execute()
 
-def load_teams():
-    res = supabase.table("teams").select("*").execute()
-    return pd.DataFrame(res.data)
-
-def load_players(batch_size=100, max_retries=3, delay=2):
-    start = 0
-    end = batch_size - 1
-    all_rows = []
-
-    while True:
-        try:
-            for attempt in range(max_retries):
-                try:
-                    response = supabase.table("players").select("*").range(start, end).execute()
-                    rows = response.data
-                    break  # Success: exit retry loop
-                except ReadError as e:
-                    time.sleep(delay)
-            else:
-                break  # Break outer loop if all retries failed
-
-            if not rows:
-                break  # No more data
+@cached("teams")
+def load_teams(columns=None):
+    res = _execute(get_client().table("teams").select(_select_list(columns)))
+    return _frame(res.data, "teams", columns)
 
-            all_rows.extend(rows)
-            start += batch_size
-            end += batch_size
-
-        except Exception as e:
-            break
+@metrics.traced("players")
+def load_players(batch_size=PAGE_SIZE, max_workers=MAX_WORKERS, max_retries=READ_RETRIES, delay=READ_BACKOFF, incremental=False,
+                 columns=None, held_by=None, players=None):
+    """
+    Load the players table, only the given columns if any, and only the
+    players held by one fantasy team and/or in a list of (Name, team) pairs.
+    incremental=True returns the delta-synced copy instead (which always
+    syncs whole rows; columns and the filters then only trim the result).
+    """
+    if incremental:
+        frame = _players_sync.sync()
+        if held_by is not None:
+            frame = frame[frame["held_by"] == held_by]
+        frame = _only_players(frame, players)
+        return typed(frame[columns] if columns else frame, "players")
+    return _load_players(batch_size, max_workers, max_retries, delay, columns, held_by,
+                         tuple(players) if players is not None else None)
 
-    return pd.DataFrame(all_rows)
+@cached("players")
+def _load_players(batch_size, max_workers, max_retries, delay, columns=None, held_by=None, players=None):
+    filters = scope_filters(players=players, held_by=held_by)
+    rows = fetch_paginated("players", batch_size, max_workers, max_retries, delay, filters, columns)
+    return _only_players(_frame(rows, "players", columns), players)
 
 # --- Load the full draft board ---
-def load_draft_board() -> pd.DataFrame:
+@metrics.traced("DraftBoard")
+def load_draft_board(incremental=False, columns=None) -> pd.DataFrame:
     """
     Pulls the DraftBoard table from Supabase and returns a DataFrame.
     Columns: Round, Pick, Name, team, Pos., FantasyTeam
+    With incremental=True only picks changed since the last sync are fetched.
     """
-    response = supabase.table("DraftBoard").select("*").execute()
-    df = pd.DataFrame(response.data)
+    if incremental:
+        board = _draft_board_sync.sync()
+        return typed(board[columns] if columns else board, "DraftBoard")
+    return _load_draft_board(columns)
+
+@cached("DraftBoard")
+def _load_draft_board(columns=None) -> pd.DataFrame:
+    response = _execute(get_client().table("DraftBoard").select(_select_list(columns)))
+    df = _frame(response.data, "DraftBoard", columns)
     return df
 
+# --- Draft change feed ---
+@cached("draft_version")
+def draft_version():
+    """
+    The draft's change counter (snapshots row 'draft'). Every pick and every
+    held_by change moves it, so pollers reload only when it differs from the
+    version they last rendered. One single-row read, shared by all sessions.
+    """
+    data = _execute(get_client().table("snapshots").select("version").eq("name", "draft")).data
+    return data[0]["version"] if data else None
+
+@invalidates("DraftBoard", "draft_version")
 def update_draft_pick_full(round_number, pick_number, name, pos, team, fantasy_team):
-    supabase.table("DraftBoard").update({
+    get_client().table("DraftBoard").update({
         "Name": name,
         "Pos.": pos,
         "team": team,
         "FantasyTeam": fantasy_team
     }).eq("Round", round_number).eq("Pick", pick_number).eq("FantasyTeam", fantasy_team).execute()
 
+@invalidates("players", "draft_version")
 def save_player(row):
     row_clean = row.where(pd.notna(row), None)
-    supabase.table("players").upsert(row_clean.to_dict()).execute()
+    get_client().table("players").upsert(row_clean.to_dict()).execute()
 
-def load_last_week_stats(batch_size=100, max_retries=3, delay=2):
-    start = 0
-    end = batch_size - 1
-    all_rows = []
+# --- Draft picks ---
+# SQLSTATEs the make_pick function rejects a pick with
+PICK_REJECTIONS = {"DP001": "not your turn", "DP002": "player not available"}
 
-    while True:
-        try:
-            for attempt in range(max_retries):
-                try:
-                    response = supabase.table("last_week_stats").select("*").range(start, end).execute()
-                    rows = response.data
-                    break  # Success: exit retry loop
-                except ReadError as e:
-                    time.sleep(delay)
-            else:
-                break  # Break outer loop if all retries failed
+class PickRejected(Exception):
+    """make_pick refused the pick; .reason is a PICK_REJECTIONS value."""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
 
-            if not rows:
-                break  # No more data
+@invalidates("DraftBoard", "players", "draft_version")
+def make_pick(round_number, pick_number, fantasy_team, name, team) -> dict:
+    """
+    Draft a player in one round trip through the make_pick database function.
+    The server checks that this is the next open pick and fantasy_team's, and
+    that the player is undrafted, then fills the board slot and held_by in one
+    transaction. Returns the filled board row; raises PickRejected otherwise.
+    """
+    try:
+        response = get_client().rpc("make_pick", {
+            "p_round": int(round_number),
+            "p_pick": int(pick_number),
+            "p_fantasy_team": fantasy_team,
+            "p_name": name,
+            "p_team": team,
+        }).execute()
+    except APIError as e:
+        if e.code in PICK_REJECTIONS:
+            raise PickRejected(PICK_REJECTIONS[e.code], e.message) from e
+        raise
+    return response.data[0]
 
-            all_rows.extend(rows)
-            start += batch_size
-            end += batch_size
+# --- last_week_stats: versioned baseline snapshots ---
+# Rows carry the snapshot versions they are valid for (valid_from <= v < valid_to)
+# and snapshots.version names the current one. Single-request readers go
+# through the last_week_stats_current view; paginated ones read the version
+# first and filter every window by it, so a load sees exactly one version.
+BASELINE_VIEW = "last_week_stats_current"
+VERSION_COLS = ["valid_from", "valid_to"]
 
-        except Exception as e:
-            break
+def baseline_filters(version):
+    """Filters selecting the last_week_stats rows of one snapshot version."""
+    return [("lte", "valid_from", version), ("or_", None, f"valid_to.is.null,valid_to.gt.{version}")]
+
+@cached("last_week_stats")
+def load_last_week_stats(batch_size=PAGE_SIZE, max_workers=MAX_WORKERS, max_retries=READ_RETRIES, delay=READ_BACKOFF, columns=None):
+    """
+    The current baseline. The version is read once and every window asks for
+    that version's rows, so a commit during the read cannot mix two versions.
+    """
+    filters = baseline_filters(baseline_version())
+    rows = fetch_paginated("last_week_stats", batch_size, max_workers, max_retries, delay, filters, columns)
+    return _frame(rows, "last_week_stats", columns).drop(columns=VERSION_COLS, errors="ignore")
+
+@metrics.traced("last_week_stats")
+def load_team_baseline(team):
+    """One college team's slice of the current baseline, indexed by (Name, team), with valid_from."""
+    data = _execute(get_client().table(BASELINE_VIEW).select("*").eq("team", team)).data
+    if not data:
+        return pd.DataFrame(columns=["valid_from"], index=pd.MultiIndex.from_tuples([], names=["Name", "team"]))
+    return pd.DataFrame(data).drop(columns=["valid_to"], errors="ignore").set_index(["Name", "team"])
+
+@metrics.traced("snapshots")
+def baseline_version():
+    data = _execute(get_client().table("snapshots").select("version").eq("name", "last_week_stats")).data
+    return data[0]["version"]
+
+# A staging lease older than this is presumed abandoned (its run died)
+STAGING_TIMEOUT = pd.Timedelta(minutes=30)
+
+class BaselineSnapshot:
+    """
+    The next version of last_week_stats, staged beside the current one.
+    Only changed rows are written: the old row is closed (valid_to) and its
+    replacement opened (valid_from), both invisible to readers until commit()
+    moves the snapshot pointer with a single update.
+
+    One run stages at a time: it holds the lease on the snapshots row from
+    here until commit() or abort(), so no other run can discard its rows or
+    stage over them.
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex
+        self.base_version = baseline_version()
+        self.version = self.base_version + 1
+        self._claim()
+        # Staged rows left now belong to a run that lost its lease; discard them
+        get_client().table("last_week_stats").delete().gt("valid_from", self.base_version).execute()
+        get_client().table("last_week_stats").update({"valid_to": None}).gt("valid_to", self.base_version).execute()
+
+    def _lease(self):
+        return get_client().table("snapshots").update(
+            {"staged_by": self.run_id, "staged_at": pd.Timestamp.now(tz="UTC").isoformat()}
+        ).eq("name", "last_week_stats").eq("version", self.base_version)
+
+    def _claim(self):
+        """Take the staging lease if it is free or older than STAGING_TIMEOUT; RuntimeError if not."""
+        if self._lease().is_("staged_by", "null").execute().data:
+            return
+        holder = _execute(
+            get_client().table("snapshots").select("version,staged_by,staged_at").eq("name", "last_week_stats")
+        ).data[0]
+        stale = (holder["staged_by"] is not None and holder["staged_at"] is not None
+                 and pd.Timestamp.now(tz="UTC") - pd.Timestamp(holder["staged_at"]) > STAGING_TIMEOUT)
+        if stale and self._lease().eq("staged_by", holder["staged_by"]).execute().data:
+            return
+        raise RuntimeError(f"last_week_stats is being staged by another run ({holder['staged_by']}) "
+                           f"or moved past version {self.base_version}")
+
+    def changes(self, current, baseline):
+        """
+        Rows to close and rows to open so that the slice covered by baseline
+        becomes current (both indexed by Name, team). Players missing from
+        current are closed; unchanged players are left alone. Missing values
+        on both sides count as unchanged.
+        """
+        old = baseline.reindex(index=current.index, columns=current.columns)
+        changed = ~((current == old) | (current.isna() & old.isna())).all(axis=1)
+        gone = ~baseline.index.isin(current.index) | baseline.index.isin(current.index[changed])
+
+        closed = baseline.loc[gone, ["valid_from"]].reset_index()
+        closed["valid_to"] = self.version
+        opened = current[changed].reset_index()
+        opened["valid_from"] = self.version
+        opened["valid_to"] = None
+        return closed, opened
+
+    def write_closed(self, closed):
+        if not closed.empty:
+            bulk_write("last_week_stats", closed.to_dict(orient="records"), on_conflict="Name,team,valid_from")
 
-    return pd.DataFrame(all_rows)
+    def write_opened(self, opened):
+        if not opened.empty:
+            bulk_write("last_week_stats", opened.to_dict(orient="records"), on_conflict="Name,team,valid_from")
 
+    def stage(self, closed, opened):
+        self.write_closed(closed)
+        self.write_opened(opened)
 
+    @invalidates("last_week_stats")
+    def commit(self):
+        """Make the staged version current, then prune superseded rows in the background."""
+        flipped = (
+            get_client().table("snapshots").update({"version": self.version, "staged_by": None, "staged_at": None})
+            .eq("name", "last_week_stats").eq("version", self.base_version).eq("staged_by", self.run_id)
+            .execute().data
+        )
+        if not flipped:
+            self.abort()
+            raise RuntimeError(f"last_week_stats moved past version {self.base_version} "
+                               f"or this run lost its staging lease")
+        threading.Thread(target=prune_baseline, args=(self.version,), daemon=True).start()
+
+    def abort(self):
+        """Give up the lease; the next run discards whatever this one staged."""
+        (get_client().table("snapshots").update({"staged_by": None, "staged_at": None})
+         .eq("name", "last_week_stats").eq("staged_by", self.run_id).execute())
+
+def prune_baseline(version):
+    """Delete rows no reader of version - 1 or later can see."""
+    get_client().table("last_week_stats").delete().lte("valid_to", version - 1).execute()
+
+@metrics.traced("last_week_stats")
 def save_last_week_stats(df: pd.DataFrame):
+    """Make df (cumulative stats indexed by Name, team) the whole baseline, as a new snapshot."""
     if df.empty:
         return
 
-    df = df.reset_index()
-    supabase.table("last_week_stats").delete().neq("Name", "").execute()
-    data = df.to_dict(orient="records")
-    supabase.table("last_week_stats").insert(data).execute()
+    snapshot = BaselineSnapshot()
+    try:
+        current = pd.DataFrame(fetch_paginated("last_week_stats", filters=baseline_filters(snapshot.base_version)))
+        if current.empty:
+            current = pd.DataFrame(columns=["Name", "team", "valid_from"])
+        current = current.drop(columns=["valid_to"], errors="ignore").set_index(["Name", "team"])
+        snapshot.stage(*snapshot.changes(df, current))
+    except BaseException:
+        snapshot.abort()
+        raise
+    snapshot.commit()
 
 
-def save_weekly_points(df, week, day):
+@invalidates("points", "player_week_points", "player_season_points")
+def save_weekly_points(df, week, day, version=None):
     """
     Saves (upserts) weekly fantasy points to the 'points' table in Supabase.
     Expects DataFrame columns: Name, team, FantasyPoints.
+    Each chunk goes through the save_points database function, which moves
+    the per-player aggregates by the difference from whatever was saved for
+    this week and day before, in the same transaction: re-saving a day is
+    safe and a failed chunk changes neither table.
+
+    version is the baseline version the points were scored up to. Points
+    for a day already scored up to an older version are added to it (a
+    rerun after a stat correction scores only the change); points of the
+    same version, or none, replace what was saved.
     """
     if df.empty:
         print("[save_weekly_points] No data to save.")
         return None
 
-    # Copy to avoid modifying original
-    df = df.copy()
-    df['Week'] = week
-    df['Day'] = day
-    
-    # Convert to list of dicts for Supabase
-    records = df.to_dict(orient="records")
-    supabase.table("points").upsert(records).execute()
+    records = (df[["Name", "team", "FantasyPoints"]].assign(Week=week, Day=day, scored_version=version)
+               .to_dict(orient="records"))
+    return bulk_write("save_points", records, op="rpc")
 
-def load_points(batch_size=100, max_retries=3, delay=2):
-    start = 0
-    end = batch_size - 1
-    all_rows = []
+@invalidates("player_week_points", "player_season_points")
+def save_player_points(weekly: pd.DataFrame, season: pd.DataFrame, removed_weekly=None, removed_season=None):
+    """
+    Upsert aggregate rows (as returned by league.player_point_totals), then
+    delete the rows keyed by removed_weekly (Name, team, Week) and
+    removed_season (Name, team), e.g. players a recompute no longer finds.
+    """
+    if not weekly.empty:
+        bulk_write("player_week_points", weekly.to_dict(orient="records"), on_conflict="Name,team,Week")
+    if not season.empty:
+        bulk_write("player_season_points", season.to_dict(orient="records"), on_conflict="Name,team")
+    if removed_weekly is not None:
+        _delete_keys("player_week_points", removed_weekly, ["team", "Week"])
+    if removed_season is not None:
+        _delete_keys("player_season_points", removed_season, ["team"])
 
-    while True:
-        try:
-            for attempt in range(max_retries):
-                try:
-                    response = supabase.table("points").select("*").range(start, end).execute()
-                    rows = response.data
-                    break  # Success: exit retry loop
-                except ReadError as e:
-                    time.sleep(delay)
-            else:
-                break  # Break outer loop if all retries failed
+DELETE_NAMES = 100  # Names per delete request (they go in the URL)
+
+def _delete_keys(table, keys: pd.DataFrame, by):
+    """Delete rows by key: one request per group of the `by` columns and DELETE_NAMES names."""
+    for values, group in keys.groupby(by, sort=False, observed=True):
+        names = group["Name"].tolist()
+        for start in range(0, len(names), DELETE_NAMES):
+            query = get_client().table(table).delete()
+            for column, value in zip(by, values):
+                query = query.eq(column, getattr(value, "item", lambda: value)())
+            query.in_("Name", names[start:start + DELETE_NAMES]).execute()
 
-            if not rows:
-                break  # No more data
+@cached("player_week_points")
+def load_player_week_points(batch_size=PAGE_SIZE, max_workers=MAX_WORKERS, max_retries=READ_RETRIES, delay=READ_BACKOFF, columns=None,
+                            week=None, weeks=None, players=None):
+    """
+    Points per player per week. Columns: Name, team, Week, WeeklyPts
+    week, weeks=(first, last) and players=[(Name, team), ...] are sent as query filters.
+    """
+    filters = scope_filters(week, weeks, players=players)
+    rows = fetch_paginated("player_week_points", batch_size, max_workers, max_retries, delay, filters, columns)
+    return _only_players(_frame(rows, "player_week_points", columns, ["Name", "team", "Week", "WeeklyPts"]), players)
 
-            all_rows.extend(rows)
-            start += batch_size
-            end += batch_size
+@cached("player_week_points")
+def latest_week():
+    """The newest week that has points, or None before any are saved."""
+    data = _execute(get_client().table("player_week_points").select("Week").order("Week", desc=True).limit(1)).data
+    return data[0]["Week"] if data else None
 
-        except Exception as e:
-            break
+@cached("player_season_points")
+def load_player_season_points(batch_size=PAGE_SIZE, max_workers=MAX_WORKERS, max_retries=READ_RETRIES, delay=READ_BACKOFF, columns=None,
+                              players=None):
+    """Season points per player. Columns: Name, team, CumulativePts"""
+    filters = scope_filters(players=players)
+    rows = fetch_paginated("player_season_points", batch_size, max_workers, max_retries, delay, filters, columns)
+    return _only_players(_frame(rows, "player_season_points", columns, ["Name", "team", "CumulativePts"]), players)
 
-    return pd.DataFrame(all_rows)
+@cached("points")
+def load_points(batch_size=PAGE_SIZE, max_workers=MAX_WORKERS, max_retries=READ_RETRIES, delay=READ_BACKOFF, columns=None,
+                week=None, weeks=None, players=None):
+    """Daily points; week, weeks=(first, last) and players=[(Name, team), ...] are sent as query filters."""
+    filters = scope_filters(week, weeks, players=players)
+    rows = fetch_paginated("points", batch_size, max_workers, max_retries, delay, filters, columns)
+    return _only_players(_frame(rows, "points", columns), players)
 
-def load_matchups():
+@cached("matchups")
+def load_matchups(columns=None, week=None, weeks=None):
 
-    data = supabase.table("matchups").select("*").execute().data
-    return pd.DataFrame(data)
+    query = get_client().table("matchups").select(_select_list(columns))
+    data = _execute(_filtered(query, scope_filters(week, weeks, week_column="week"))).data
+    return _frame(data, "matchups", columns)
 
+@invalidates("active_roster")
 def delete_prev_roster(team_name, selected_week):
-    supabase.table("active_roster").delete().eq("team_name", team_name).eq("week", selected_week).execute()
+    get_client().table("active_roster").delete().eq("team_name", team_name).eq("week", selected_week).execute()
 
 
+@invalidates("active_roster")
 def submit_roster(all_rows):
-    supabase.table("active_roster").insert(all_rows).execute()
+    return bulk_write("active_roster", all_rows, op="insert")
 
-def load_roster():
-    data = supabase.table("active_roster").select("*").execute().data
-    return pd.DataFrame(data)
+@cached("active_roster")
+def load_roster(columns=None, week=None, weeks=None, team_name=None):
+    """
+    Submitted lineups. Columns: week, team_name, player_name, team, player_pos
+    week, weeks=(first, last) and team_name are sent as query filters.
+    """
+    query = get_client().table("active_roster").select(_select_list(columns))
+    data = _execute(_filtered(query, scope_filters(week, weeks, week_column="week", team_name=team_name))).data
+    return _frame(data, "active_roster", columns, ["week", "team_name", "player_name", "team", "player_pos"])
 
+@invalidates("matchups")
 def save_weekly_matchups(week_matchups: pd.DataFrame, week_num):
     """
     Saves weekly matchup results (Week, home_team, away_team, home_team_points, away_team_points)
@@ -196,11 +1064,25 @@ def save_weekly_matchups(week_matchups: pd.DataFrame, week_num):
     records = upload_df.to_dict(orient="records")
 
     # --- Delete any existing records for that week (to prevent duplicates) ---
-    supabase.table("matchups").delete().eq("week", week_num).execute()
+    get_client().table("matchups").delete().eq("week", week_num).execute()
 
     # --- Insert new records ---
-    supabase.table("matchups").insert(records).execute()
+    return bulk_write("matchups", records, op="insert")
+
+@invalidates("matchups")
+def save_matchup_scores(matchups: pd.DataFrame):
+    """Upsert the scores of the given matchups, keyed on (week, home_team, away_team)."""
+    upload_cols = ["week", "home_team", "away_team", "home_team_points", "away_team_points"]
+    records = matchups[upload_cols].astype(object).where(matchups[upload_cols].notna(), None).to_dict(orient="records")
+    return bulk_write("matchups", records, on_conflict="week,home_team,away_team")
 
+@invalidates("teams")
+def save_standings(standings: pd.DataFrame):
+    """Write W/L/PF/PA/Place for every team in one bulk upsert keyed on team_name."""
+    records = standings[["team_name", "W", "L", "PF", "PA", "Place"]].to_dict(orient="records")
+    return bulk_write("teams", records, on_conflict="team_name")
+
+@invalidates("teams")
 def update_team_record(team_name, W=None, L=None, PF=None, PA=None, Place=None):
     """Update individual team record values in Supabase."""
     updates = {}
@@ -216,7 +1098,14 @@ def update_team_record(team_name, W=None, L=None, PF=None, PA=None, Place=None):
         updates["Place"] = int(Place)
 
     if updates:
-        supabase.table("teams").update(updates).eq("team_name", team_name).execute()
+        get_client().table("teams").update(updates).eq("team_name", team_name).execute()
 
     
 
+
+# --- Cold start: warm the caches once per server process (see prewarm.py) ---
+# Streamlit has no server start hook; the first script run of any page
+# imports this module, which is as early as the server runs app code.
+if setting("PREWARM", "on") != "off" and st.runtime.exists():
+    import prewarm
+    prewarm.start()
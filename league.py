@@ -0,0 +1,121 @@
+# league.py
+"""League-wide computations shared by the pages and the Commissioner tools."""
+import numpy as np
+import pandas as pd
+
+STANDINGS_COLS = ["team_name", "W", "L", "PF", "PA", "Place"]
+
+def compute_standings(matchups: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
+    """
+    W/L/PF/PA/Place for every team, recomputed from all scored matchups in one
+    vectorized pass. The result depends only on the matchups, so saving the
+    same week twice cannot double-count. Matchups without points are ignored
+    and ties count as neither a win nor a loss.
+    """
+    played = matchups.dropna(subset=["home_team_points", "away_team_points"])
+    home = pd.DataFrame({"team_name": played["home_team"], "PF": played["home_team_points"], "PA": played["away_team_points"]})
+    away = pd.DataFrame({"team_name": played["away_team"], "PF": played["away_team_points"], "PA": played["home_team_points"]})
+    games = pd.concat([home, away], ignore_index=True)
+    games["W"] = (games["PF"] > games["PA"]).astype(int)
+    games["L"] = (games["PF"] < games["PA"]).astype(int)
+    totals = games.groupby("team_name")[["W", "L", "PF", "PA"]].sum()
+
+    standings = teams[["team_name"]].join(totals, on="team_name")
+    # Cast before filling: points read as JSON can arrive as object columns
+    standings[["W", "L"]] = standings[["W", "L"]].astype(float).fillna(0).astype(int)
+    standings[["PF", "PA"]] = standings[["PF", "PA"]].astype(float).fillna(0.0).round(1)
+    standings = standings.sort_values(
+        by=["W", "L", "PF", "team_name"], ascending=[False, True, False, True], kind="stable"
+    ).reset_index(drop=True)
+    standings["Place"] = range(1, len(standings) + 1)
+    return standings[STANDINGS_COLS]
+
+def player_point_totals(points: pd.DataFrame):
+    """
+    Aggregate raw daily points into (weekly, season) frames:
+    Name, team, Week, WeeklyPts and Name, team, CumulativePts.
+    """
+    if points.empty:
+        return (pd.DataFrame(columns=["Name", "team", "Week", "WeeklyPts"]),
+                pd.DataFrame(columns=["Name", "team", "CumulativePts"]))
+    weekly = (
+        points.groupby(["Name", "team", "Week"], sort=False, observed=True)["FantasyPoints"].sum()
+        .rename("WeeklyPts").reset_index()
+    )
+    season = (
+        weekly.groupby(["Name", "team"], sort=False, observed=True)["WeeklyPts"].sum()
+        .rename("CumulativePts").reset_index()
+    )
+    return weekly, season
+
+def score_matchups(matchups: pd.DataFrame, rosters: pd.DataFrame, week_points: pd.DataFrame):
+    """
+    Score every matchup in the given frames, for one week or many, with one
+    merge and one groupby.
+
+    matchups: week, home_team, away_team (other columns are kept)
+    rosters: active_roster rows (week, team_name, player_name, team, player_pos)
+    week_points: player_week_points rows (Name, team, Week, WeeklyPts)
+
+    Returns (matchups with home_team_points / away_team_points, rosters with
+    each player's points for the week). A team scores the sum of its starters.
+    """
+    pts = week_points.rename(columns={"Name": "player_name", "Week": "week", "WeeklyPts": "points"})
+    rosters = rosters.drop(columns=["points"], errors="ignore").merge(
+        pts[["player_name", "team", "week", "points"]], on=["player_name", "team", "week"], how="left"
+    )
+    rosters["points"] = rosters["points"].astype(float).fillna(0.0).round(1)
+
+    starters = rosters[rosters["player_pos"] == "starter"]
+    totals = starters.groupby(["week", "team_name"])["points"].sum().round(1)
+
+    matchups = matchups.drop(columns=["home_team_points", "away_team_points"], errors="ignore")
+    home = pd.MultiIndex.from_arrays([matchups["week"], matchups["home_team"]])
+    away = pd.MultiIndex.from_arrays([matchups["week"], matchups["away_team"]])
+    matchups = matchups.assign(
+        home_team_points=totals.reindex(home, fill_value=0.0).to_numpy(),
+        away_team_points=totals.reindex(away, fill_value=0.0).to_numpy(),
+    )
+    return matchups, rosters
+
+def recompute_season(points, rosters, matchups, teams):
+    """
+    Rebuild the whole season from the raw tables in one pass.
+    Returns (weekly, season, matchups, standings): the per-player aggregates,
+    every matchup rescored for the weeks that have points (other weeks are
+    left as they are) and the standings. Output order is deterministic.
+    """
+    weekly, season = player_point_totals(points)
+    weekly = weekly.sort_values(["Name", "team", "Week"]).reset_index(drop=True)
+    season = season.sort_values(["Name", "team"]).reset_index(drop=True)
+
+    score_cols = ["home_team_points", "away_team_points"]
+    played = matchups["week"].isin(weekly["Week"].unique())
+    scored, _ = score_matchups(matchups[played], rosters, weekly)
+    matchups = matchups.astype({col: float for col in score_cols if col in matchups})
+    matchups.loc[played, score_cols] = scored[score_cols].to_numpy()
+    matchups = matchups.sort_values(["week", "home_team", "away_team"]).reset_index(drop=True)
+    standings = compute_standings(matchups, teams)
+    return weekly, season, matchups, standings
+
+def changed_rows(new: pd.DataFrame, old: pd.DataFrame, key, columns):
+    """
+    Rows of new that old lacks (by key) or whose columns differ from old's.
+    Numbers compare with np.isclose, and two missing values count as equal.
+    """
+    merged = new[key + columns].merge(old[key + columns], on=key, how="left", suffixes=("", "_old"), indicator=True)
+    differs = (merged["_merge"] == "left_only").to_numpy()
+    for col in columns:
+        a, b = merged[col], merged[f"{col}_old"]
+        both_missing = (a.isna() & b.isna()).to_numpy()
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            same = np.isclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float))
+        else:
+            same = (a == b).to_numpy()
+        differs |= ~(same | both_missing)
+    return new[differs]
+
+def removed_keys(new: pd.DataFrame, old: pd.DataFrame, key):
+    """The keys of old's rows that new no longer has."""
+    gone = ~pd.MultiIndex.from_frame(old[key]).isin(pd.MultiIndex.from_frame(new[key]))
+    return old.loc[gone, key].reset_index(drop=True)
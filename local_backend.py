@@ -0,0 +1,555 @@
+# local_backend.py
+"""
+An in-process stand-in for the Supabase client, so the app can be run and
+benchmarked offline.
+
+LocalClient implements the part of the PostgREST query builder that db_utils
+uses, and the database functions it calls through rpc(), on an in-memory
+store seeded from the CSVs in the repo. Every execute() is one round trip:
+it is counted in LocalClient.stats and can sleep for an injected latency
+first, so timings behave like they do against the network.
+"""
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+import pandas as pd
+from postgrest.exceptions import APIError
+
+import league
+import metrics
+
+DATA_DIR = Path(__file__).resolve().parent
+
+# Conflict target used by upserts that do not name one (the table's primary key)
+PRIMARY_KEYS = {
+    "players": ("Name", "team"),
+    "points": ("Name", "team", "Week", "Day"),
+    "last_week_stats": ("Name", "team", "valid_from"),
+    "DraftBoard": ("Round", "Pick"),
+    "teams": ("team_name",),
+    "matchups": ("week", "home_team", "away_team"),
+    "player_week_points": ("Name", "team", "Week"),
+    "player_season_points": ("Name", "team"),
+    "snapshots": ("name",),
+    "active_roster": ("id",),
+}
+# Tables whose updated_at is stamped on every insert and update
+STAMPED_TABLES = {"players", "DraftBoard"}
+# Tables filled by an identity column when a row arrives without one
+IDENTITY_TABLES = {"active_roster": "id"}
+SCAN_CACHE_ENTRIES = 32
+# Writes that touch rows of these tables move a snapshots counter (the
+# bump_draft_version triggers)
+VERSION_TRIGGERS = {"DraftBoard": "draft", "players": "draft"}
+
+@dataclass
+class LocalResponse:
+    data: list
+    count: int = None
+
+
+# --- Store ---
+class LocalClient:
+    """
+    Drop-in for the supabase client's table() and rpc() interface.
+    latency (plus up to jitter more) seconds are slept before every request,
+    outside the store lock, so parallel requests overlap like real ones, and
+    a share error_rate of reads fail with httpx.ReadError.
+    """
+
+    def __init__(self, tables=None, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.tables = {name: list(rows) for name, rows in (tables or {}).items()}
+        self.views = {"last_week_stats_current": self._current_baseline}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stats = Counter()
+        self._lock = threading.RLock()
+        self._next_id = Counter({
+            table: max((row.get(column) or 0 for row in self.tables.get(table, [])), default=0)
+            for table, column in IDENTITY_TABLES.items()
+        })
+        self._last_stamp = datetime.fromtimestamp(0, timezone.utc)
+        # Filtered rows of recent selects, so the windows of one paginated read
+        # share a single scan; any write starts a new generation
+        self._writes = 0
+        self._scans = {}
+        self._indexes = {}
+
+    @classmethod
+    def from_csvs(cls, directory=DATA_DIR, **kwargs):
+        return cls(seed_tables(directory), **kwargs)
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name, params=None):
+        return LocalCall(self, name, params or {})
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    # --- Request handling ---
+    def _round_trip(self, table, read=False):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        metrics.count(round_trips=1)
+        with self._lock:
+            self.stats["round_trips"] += 1
+            self.stats[f"round_trips:{table}"] += 1
+            if read and self.error_rate and random.random() < self.error_rate:
+                self.stats["read_errors"] += 1
+                raise httpx.ReadError(f"injected read error on {table}")
+
+    def _rows(self, table):
+        if table in self.views:
+            return self.views[table]()
+        if table not in self.tables:
+            raise APIError({"message": f'relation "public.{table}" does not exist', "code": "42P01"})
+        return self.tables[table]
+
+    def _scan(self, query):
+        """The rows of query.table matching its filters, in its order, unsliced."""
+        key = (query.table, self._writes, tuple(query.filters), tuple(query.ordering))
+        if key not in self._scans:
+            rows = self._rows(query.table)
+            if len(self._scans) >= SCAN_CACHE_ENTRIES or any(k[1] != self._writes for k in self._scans):
+                self._scans.clear()
+            self._scans[key] = query._ordered([row for row in rows if query._matches(row)] if query.filters else rows)
+        return self._scans[key]
+
+    def _bump(self, table):
+        name = VERSION_TRIGGERS.get(table)
+        snapshots = self.tables.get("snapshots", [])
+        for i, row in enumerate(snapshots):
+            if row["name"] == name:
+                snapshots[i] = {**row, "version": row["version"] + 1}
+
+    def _index(self, table, key):
+        """Row positions by key for the table, kept up to date by the writer that asks for it."""
+        index = self._indexes.get((table, key))
+        if index is None:
+            index = {_key(row, key): i for i, row in enumerate(self.tables[table])}
+        # Only the index being written through stays current
+        self._drop_indexes(table)
+        self._indexes[(table, key)] = index
+        return index
+
+    def _drop_indexes(self, table):
+        for name in [name for name in self._indexes if name[0] == table]:
+            del self._indexes[name]
+
+    def _current_baseline(self):
+        version = next(row["version"] for row in self.tables["snapshots"] if row["name"] == "last_week_stats")
+        return [
+            row for row in self.tables["last_week_stats"]
+            if row["valid_from"] <= version and (row["valid_to"] is None or row["valid_to"] > version)
+        ]
+
+    def _stamp(self, table, row):
+        if table in STAMPED_TABLES:
+            now = max(datetime.now(timezone.utc), self._last_stamp + timedelta(microseconds=1))
+            self._last_stamp = now
+            row["updated_at"] = now.isoformat(timespec="microseconds")
+        if table in IDENTITY_TABLES and row.get(IDENTITY_TABLES[table]) is None:
+            self._next_id[table] += 1
+            row[IDENTITY_TABLES[table]] = self._next_id[table]
+        return row
+
+    def _columns(self, table):
+        rows = self.tables.get(table)
+        return list(rows[0]) if rows else []
+
+    def _write_target(self, table):
+        if table in self.views:
+            raise APIError({"message": f'cannot change view "{table}"', "code": "55000"})
+        return self._rows(table)
+
+
+# --- Query builder ---
+class LocalQuery:
+    """One table request, built up the way a postgrest-py request builder is."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns = None
+        self.count = None
+        self.head = False
+        self.payload = None
+        self.on_conflict = None
+        self.returning = "representation"
+        self.filters = []
+        self.ordering = []
+        self.window = None
+        self.max_rows = None
+        self.affected = 0
+
+    # --- Actions ---
+    def select(self, *columns, count=None, head=False):
+        names = [c.strip().strip('"') for col in columns for c in col.split(",")]
+        self.columns = None if not names or "*" in names else names
+        self.count = count
+        self.head = head
+        return self
+
+    def insert(self, json, count=None, returning="representation", upsert=False, **_):
+        self.action = "upsert" if upsert else "insert"
+        self.payload = json if isinstance(json, list) else [json]
+        self.returning = returning
+        return self
+
+    def upsert(self, json, count=None, returning="representation", ignore_duplicates=False,
+               on_conflict="", **_):
+        self.action = "ignore" if ignore_duplicates else "upsert"
+        self.payload = json if isinstance(json, list) else [json]
+        self.returning = returning
+        self.on_conflict = tuple(c.strip().strip('"') for c in on_conflict.split(",")) if on_conflict else None
+        return self
+
+    def update(self, json, count=None, returning="representation", **_):
+        self.action = "update"
+        self.payload = json
+        self.returning = returning
+        return self
+
+    def delete(self, count=None, returning="representation", **_):
+        self.action = "delete"
+        self.returning = returning
+        return self
+
+    # --- Filters and modifiers ---
+    def _filter(self, op, column, value):
+        self.filters.append((op, column.strip('"'), value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, _sortable(value))
+
+    def gte(self, column, value):
+        return self._filter("gte", column, _sortable(value))
+
+    def lt(self, column, value):
+        return self._filter("lt", column, _sortable(value))
+
+    def lte(self, column, value):
+        return self._filter("lte", column, _sortable(value))
+
+    def in_(self, column, values):
+        return self._filter("in", column, frozenset(values))
+
+    def is_(self, column, value):
+        return self._filter("is", column, None if str(value).lower() == "null" else value)
+
+    def or_(self, filters, **_):
+        """PostgREST's or=(...): comma-separated column.operator.value terms, one of which must hold."""
+        terms = []
+        for term in filters.split(","):
+            column, op, value = term.split(".", 2)
+            terms.append((op, column.strip('"'), _literal(value)))
+        self.filters.append(("or", None, tuple(terms)))
+        return self
+
+    def order(self, column, *, desc=False, nullsfirst=None, **_):
+        self.ordering.append((column.strip('"'), desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def limit(self, size, **_):
+        self.max_rows = size
+        return self
+
+    def range(self, start, end, **_):
+        self.window = (start, end)
+        return self
+
+    # --- Execution ---
+    def _matches(self, row):
+        return all(any(_TESTS[o](row.get(c), v) for o, c, v in value) if op == "or" else _TESTS[op](row.get(column), value)
+                   for op, column, value in self.filters)
+
+    def execute(self) -> LocalResponse:
+        client = self.client
+        client._round_trip(self.table, read=self.action == "select")
+        with client._lock:
+            if self.action == "select":
+                response = self._select(client._scan(self))
+            else:
+                client._writes += 1
+                response = getattr(self, f"_{self.action}")(client._write_target(self.table))
+                if self.affected:
+                    client._bump(self.table)
+            client.stats["rows_returned"] += len(response.data)
+        return response
+
+    def _ordered(self, rows):
+        for column, desc, nulls_first in reversed(self.ordering):
+            present = sorted((r for r in rows if r.get(column) is not None),
+                             key=lambda r: _sortable(r[column]), reverse=desc)
+            missing = [r for r in rows if r.get(column) is None]
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def _select(self, rows):
+        total = len(rows) if self.count else None
+        if self.window:
+            rows = rows[self.window[0]:self.window[1] + 1]
+        if self.max_rows is not None:
+            rows = rows[:self.max_rows]
+        if self.head:
+            rows = []
+        return LocalResponse([self._project(row) for row in rows], total)
+
+    def _project(self, row):
+        if self.columns is None:
+            return dict(row)
+        return {column: row.get(column) for column in self.columns}
+
+    def _returned(self, rows):
+        self.affected = len(rows)
+        return LocalResponse([] if self.returning == "minimal" else [dict(row) for row in rows])
+
+    def _insert(self, rows):
+        key = PRIMARY_KEYS.get(self.table)
+        position = self.client._index(self.table, key) if key else {}
+        columns = self.client._columns(self.table)
+        added = []
+        for record in self.payload:
+            row = self.client._stamp(self.table, {**dict.fromkeys(columns), **_clean(record)})
+            if key and _key(row, key) in position:
+                raise APIError({"message": f'duplicate key value violates unique constraint on "{self.table}"',
+                                "code": "23505"})
+            if key:
+                position[_key(row, key)] = len(rows) + len(added)
+            added.append(row)
+        rows.extend(added)
+        return self._returned(added)
+
+    def _upsert(self, rows, ignore=False):
+        key = self.on_conflict or PRIMARY_KEYS[self.table]
+        position = self.client._index(self.table, key)
+        columns = self.client._columns(self.table)
+        written = []
+        for record in self.payload:
+            record = _clean(record)
+            i = position.get(_key(record, key))
+            if i is None:
+                row = self.client._stamp(self.table, {**dict.fromkeys(columns), **record})
+                position[_key(row, key)] = len(rows)
+                rows.append(row)
+            elif ignore:
+                continue
+            else:
+                row = self.client._stamp(self.table, {**rows[i], **record})
+                rows[i] = row
+            written.append(row)
+        return self._returned(written)
+
+    def _ignore(self, rows):
+        return self._upsert(rows, ignore=True)
+
+    def _update(self, rows):
+        self.client._drop_indexes(self.table)
+        changes = _clean(self.payload)
+        updated = []
+        for i, row in enumerate(rows):
+            if self._matches(row):
+                rows[i] = self.client._stamp(self.table, {**row, **changes})
+                updated.append(rows[i])
+        return self._returned(updated)
+
+    def _delete(self, rows):
+        self.client._drop_indexes(self.table)
+        deleted = [row for row in rows if self._matches(row)]
+        rows[:] = [row for row in rows if not self._matches(row)]
+        return self._returned(deleted)
+
+
+# --- Database functions ---
+class LocalCall:
+    """One client.rpc() call: a FUNCTIONS entry run under the store lock, like a transaction."""
+
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> LocalResponse:
+        client = self.client
+        if self.name not in FUNCTIONS:
+            raise APIError({"message": f"Could not find the function public.{self.name}", "code": "PGRST202"})
+        client._round_trip(f"rpc:{self.name}")
+        with client._lock:
+            client._writes += 1
+            data = FUNCTIONS[self.name](client, **_clean(self.params))
+            client.stats["rows_returned"] += len(data)
+        return LocalResponse(data)
+
+def _make_pick(client, p_round, p_pick, p_fantasy_team, p_name, p_team):
+    """The make_pick migration: check the turn and the player, then write both rows."""
+    board, players = client.tables["DraftBoard"], client.tables["players"]
+    slot = client._index("DraftBoard", PRIMARY_KEYS["DraftBoard"]).get((p_round, p_pick))
+    if (slot is None or board[slot]["Name"] is not None or board[slot]["FantasyTeam"] != p_fantasy_team
+            or any(row["Name"] is None and (row["Round"], row["Pick"]) < (p_round, p_pick) for row in board)):
+        raise APIError({"message": f"round {p_round}, pick {p_pick} is not {p_fantasy_team} to make",
+                        "code": "DP001"})
+    player = client._index("players", PRIMARY_KEYS["players"]).get((p_name, p_team))
+    if player is None or players[player]["held_by"] is not None:
+        raise APIError({"message": f"{p_name} ({p_team}) is not available", "code": "DP002"})
+
+    players[player] = client._stamp("players", {**players[player], "held_by": p_fantasy_team})
+    board[slot] = client._stamp("DraftBoard", {**board[slot], "Name": p_name, "team": p_team,
+                                               "Pos.": players[player]["Pos."]})
+    client._bump("players")
+    client._bump("DraftBoard")
+    return [dict(board[slot])]
+
+def _save_points(client, p_rows):
+    """
+    The save_points migrations: upsert points (adding to a row scored up to
+    another baseline version) and move both aggregates by the difference.
+    """
+    points = client.tables["points"]
+    position = client._index("points", PRIMARY_KEYS["points"])
+    delta = {}
+    for record in p_rows:
+        key = _key(record, PRIMARY_KEYS["points"])
+        i = position.get(key)
+        old = 0.0 if i is None else points[i]["FantasyPoints"] or 0.0
+        version = record.get("scored_version")
+        if i is not None and version is not None and points[i].get("scored_version") != version:
+            record = {**record, "FantasyPoints": old + record["FantasyPoints"]}
+        if i is None:
+            position[key] = len(points)
+            points.append({**dict.fromkeys(client._columns("points")), **record})
+        else:
+            points[i] = {**points[i], **record}
+        week_key = (record["Name"], record["team"], record["Week"])
+        delta[week_key] = delta.get(week_key, 0.0) + record["FantasyPoints"] - old
+    season = {}
+    for (name, team, week), pts in delta.items():
+        season[(name, team)] = season.get((name, team), 0.0) + pts
+    _add(client, "player_week_points", "WeeklyPts", {key: pts for key, pts in delta.items() if pts != 0})
+    _add(client, "player_season_points", "CumulativePts", {key: pts for key, pts in season.items() if pts != 0})
+    return [len(p_rows)]
+
+def _add(client, table, column, amounts):
+    """Add amounts (primary key -> value) to column, inserting rows that are missing."""
+    rows = client.tables[table]
+    position = client._index(table, PRIMARY_KEYS[table])
+    for key, amount in amounts.items():
+        i = position.get(key)
+        if i is None:
+            position[key] = len(rows)
+            rows.append({**dict(zip(PRIMARY_KEYS[table], key)), column: amount})
+        else:
+            rows[i] = {**rows[i], column: rows[i][column] + amount}
+
+FUNCTIONS = {"make_pick": _make_pick, "save_points": _save_points}
+
+
+_TESTS = {
+    "eq": lambda v, x: v is not None and v == x,
+    "neq": lambda v, x: v is not None and v != x,
+    "gt": lambda v, x: v is not None and _sortable(v) > x,
+    "gte": lambda v, x: v is not None and _sortable(v) >= x,
+    "lt": lambda v, x: v is not None and _sortable(v) < x,
+    "lte": lambda v, x: v is not None and _sortable(v) <= x,
+    "in": lambda v, x: v in x,
+    "is": lambda v, x: v is x,
+}
+
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}T")
+
+def _sortable(value):
+    """Compare ISO timestamps as instants (like timestamptz), everything else as is."""
+    if isinstance(value, str) and _TIMESTAMP.match(value):
+        return datetime.fromisoformat(value)
+    return value
+
+def _literal(text):
+    """A value written in a PostgREST filter string: null, a number or text."""
+    if text == "null":
+        return None
+    for parse in (int, float):
+        try:
+            return parse(text)
+        except ValueError:
+            pass
+    return _sortable(text)
+
+def _key(row, columns):
+    return tuple(row.get(column) for column in columns)
+
+def _clean(record):
+    """A JSON-like copy of a record: NaN becomes None and numpy scalars plain Python."""
+    return {k: None if _is_missing(v) else getattr(v, "item", lambda: v)() for k, v in dict(record).items()}
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value) or value is pd.NaT
+
+
+# --- Seeding ---
+def _read_csv(path):
+    df = pd.read_csv(path)
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+def seed_tables(directory=DATA_DIR):
+    """
+    The league tables as rows, from players.csv, points.csv, last_week_stats.csv,
+    matchups.csv, draft_order.csv and teams.csv. Columns the CSV exports predate
+    (points Week/Day, the baseline versions, team records) get their defaults,
+    and the points aggregates are derived from points.
+    """
+    directory = Path(directory)
+    points = pd.read_csv(directory / "points.csv")
+    for column in ("Week", "Day"):
+        if column not in points.columns:
+            points[column] = 1
+    weekly, season = league.player_point_totals(points)
+
+    baseline = _read_csv(directory / "last_week_stats.csv")
+    for row in baseline:
+        row.setdefault("valid_from", 0)
+        row.setdefault("valid_to", None)
+
+    teams = _read_csv(directory / "teams.csv")
+    for row in teams:
+        for column in ("W", "L", "PF", "PA", "Place"):
+            row.setdefault(column, 0)
+
+    tables = {
+        "players": _read_csv(directory / "players.csv"),
+        "points": points.to_dict(orient="records"),
+        "last_week_stats": baseline,
+        "snapshots": [{"name": "last_week_stats", "version": 0, "staged_by": None, "staged_at": None},
+                      {"name": "draft", "version": 0, "staged_by": None, "staged_at": None}],
+        "matchups": _read_csv(directory / "matchups.csv"),
+        "DraftBoard": _read_csv(directory / "draft_order.csv"),
+        "teams": teams,
+        "active_roster": [],
+        "player_week_points": weekly.to_dict(orient="records"),
+        "player_season_points": season.to_dict(orient="records"),
+    }
+    stamp = datetime.now(timezone.utc).isoformat(timespec="microseconds")
+    for name in STAMPED_TABLES:
+        for row in tables[name]:
+            row["updated_at"] = stamp
+    return {name: [_clean(row) for row in rows] for name, rows in tables.items()}
@@ -0,0 +1,339 @@
+# metrics.py
+"""
+Timing and I/O instrumentation.
+
+A span is one timed call: a db_utils read or write (its table, filters,
+round trips, rows, bytes received and retries) or a named page section
+such as roster building or scoring. Finished spans go to
+
+- a rotating JSONL file, one span per line,
+- process-wide aggregates, served in the Prometheus text format by serve(),
+- the session's list for panel(), the developer breakdown of a rerun.
+
+I/O is counted into every open span of the calling thread, so a loader's
+span includes the requests of the helpers it calls; bind() carries the
+open span into worker threads.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SESSION_SPANS = 500  # spans kept per session for the panel
+MAX_SESSIONS = 200   # sessions kept, oldest dropped first
+IO_FIELDS = ("round_trips", "rows", "bytes", "retries")
+
+_active = contextvars.ContextVar("metrics_span", default=None)
+_lock = threading.Lock()
+_totals = defaultdict(lambda: {"count": 0, "sum": 0.0, "errors": 0, "buckets": [0] * len(BUCKETS),
+                               **dict.fromkeys(IO_FIELDS, 0)})
+_sessions = {}
+_file_logger = None
+_server = None
+_connections = None
+
+
+# --- Spans ---
+class Span:
+    def __init__(self, name, kind, table=None, filters=None):
+        self.name = name
+        self.kind = kind
+        self.table = table
+        self.filters = filters
+        self.parent = _active.get()
+        self.depth = self.parent.depth + 1 if self.parent else 0
+        # Inside another db call, whose span already counts this one's I/O
+        self.nested = self.parent is not None and self.parent.kind == "db"
+        self.io = dict.fromkeys(IO_FIELDS, 0)
+        self.error = None
+        self.started = time.time()
+        self.seconds = None
+        self._io_lock = threading.Lock()
+
+    def add(self, **io):
+        with self._io_lock:
+            for field, value in io.items():
+                self.io[field] += value
+
+    def record(self):
+        return {"name": self.name, "kind": self.kind, "table": self.table, "filters": self.filters,
+                "depth": self.depth, "nested": self.nested, "started": round(self.started, 6),
+                "seconds": round(self.seconds, 6), **self.io, "error": self.error}
+
+class span:
+    """
+    Time a block as a span: `with metrics.span("build roster"):`. kind is
+    "section" for page code and "db" for db_utils calls.
+    """
+
+    def __init__(self, name, kind="section", table=None, filters=None):
+        self.span = Span(name, kind, table, filters)
+
+    def __enter__(self):
+        self._token = _active.set(self.span)
+        self._start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.seconds = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.span.error = exc_type.__name__
+        _active.reset(self._token)
+        _finish(self.span)
+        return False
+
+def traced(table=None, kind="db"):
+    """Decorator: run every call of a function in a span named after it, with its arguments as filters."""
+    def decorator(func):
+        name = func.__name__.lstrip("_")
+        try:
+            signature = inspect.signature(func)
+        except (TypeError, ValueError):
+            signature = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _active.get()
+            # A public loader and the cached _loader it calls are one call
+            if current is not None and (current.name, current.table) == (name, table):
+                return func(*args, **kwargs)
+            with span(name, kind, table, _describe(_arguments(signature, args, kwargs))):
+                return func(*args, **kwargs)
+        if hasattr(func, "clear"):
+            wrapper.clear = func.clear
+        return wrapper
+    return decorator
+
+def count(**io):
+    """Add I/O (round_trips, rows, bytes, retries) to every open span of this thread."""
+    current = _active.get()
+    while current is not None:
+        current.add(**io)
+        current = current.parent
+
+def bind(func):
+    """func, running inside the caller's open span when called from another thread."""
+    current = _active.get()
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs):
+        token = _active.set(current)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _active.reset(token)
+    return bound
+
+def _arguments(signature, args, kwargs):
+    """A call's arguments by parameter name, positional ones included (self and cls left out)."""
+    if signature is None:
+        return kwargs
+    try:
+        bound = signature.bind_partial(*args, **kwargs)
+    except TypeError:
+        # A bad call: func raises the error itself
+        return kwargs
+    arguments = {key: value for key, value in bound.arguments.items() if key not in ("self", "cls")}
+    # **kwargs parameters come back as one dict; record their items instead
+    for parameter in signature.parameters.values():
+        if parameter.kind is inspect.Parameter.VAR_KEYWORD:
+            arguments.update(arguments.pop(parameter.name, {}))
+    return arguments
+
+_PLAIN = (str, int, float, bool)
+
+def _describe(kwargs):
+    """
+    Call arguments as short JSON-able filters: scalars as they are, a few
+    plain values as a list, any other sized object (a frame, a row, a
+    registry) as its type and length. Other objects are left out.
+    """
+    filters = {}
+    for key, value in kwargs.items():
+        if value is None or isinstance(value, _PLAIN):
+            pass
+        elif pd.api.types.is_scalar(value):
+            value = value.item() if hasattr(value, "item") else str(value)
+        elif isinstance(value, (list, tuple)) and len(value) <= 4 and all(isinstance(v, _PLAIN) for v in value):
+            value = list(value)
+        elif hasattr(value, "__len__"):
+            value = f"<{type(value).__name__} of {len(value)}>"
+        else:
+            continue
+        if value is not None:
+            filters[key] = value
+    return filters or None
+
+
+# --- Sinks ---
+def configure(path=None, max_bytes=5_000_000, backups=3):
+    """Write finished spans to path as JSONL, rotated at max_bytes with `backups` old files kept."""
+    global _file_logger
+    logger = logging.getLogger("fhl.metrics")
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    _file_logger = None
+    if path:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        _file_logger = logger
+
+def _finish(finished):
+    record = finished.record()
+    key = (finished.kind, finished.name, finished.table or "")
+    with _lock:
+        totals = _totals[key]
+        totals["count"] += 1
+        totals["sum"] += finished.seconds
+        totals["errors"] += finished.error is not None
+        for i, bound in enumerate(BUCKETS):
+            if finished.seconds <= bound:
+                totals["buckets"][i] += 1
+        for field in IO_FIELDS:
+            totals[field] += finished.io[field]
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is not None:
+        record["session"] = ctx.session_id
+        with _lock:
+            if ctx.session_id not in _sessions and len(_sessions) >= MAX_SESSIONS:
+                del _sessions[next(iter(_sessions))]
+            _sessions.setdefault(ctx.session_id, deque(maxlen=SESSION_SPANS)).append(record)
+    if _file_logger is not None:
+        _file_logger.info(json.dumps(record, default=str))
+
+
+# --- HTTP connection pool ---
+def watch_connections(stats):
+    """Report stats (db_utils.ConnectionStats) in render() and the panel."""
+    global _connections
+    _connections = stats
+
+def _connection_lines():
+    if _connections is None:
+        return []
+    snapshot = _connections.snapshot()
+    lines = ["# HELP fhl_http_requests_total Requests sent over the pooled HTTP client, by HTTP version.",
+             "# TYPE fhl_http_requests_total counter"]
+    lines += [f'fhl_http_requests_total{{http_version="{_label(version)}"}} {count}'
+              for version, count in sorted(snapshot["http_versions"].items())]
+    lines += ["# HELP fhl_http_connections_total Connections the pool opened; other requests reused one.",
+              "# TYPE fhl_http_connections_total counter",
+              f"fhl_http_connections_total {snapshot['connections']}",
+              "# HELP fhl_http_connection_reuse_ratio Share of requests sent over a reused connection.",
+              "# TYPE fhl_http_connection_reuse_ratio gauge",
+              f"fhl_http_connection_reuse_ratio {snapshot['reuse_ratio'] or 0}"]
+    return lines
+
+
+# --- Prometheus text endpoint ---
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render() -> str:
+    """The aggregates in the Prometheus text exposition format."""
+    with _lock:
+        items = [(key, {**totals, "buckets": list(totals["buckets"])}) for key, totals in _totals.items()]
+    lines = [
+        "# HELP fhl_span_seconds Time spent in db_utils calls and page sections.",
+        "# TYPE fhl_span_seconds histogram",
+    ]
+    for (kind, name, table), totals in items:
+        labels = f'kind="{_label(kind)}",name="{_label(name)}",table="{_label(table)}"'
+        for bound, hits in zip(BUCKETS, totals["buckets"]):
+            lines.append(f'fhl_span_seconds_bucket{{{labels},le="{bound}"}} {hits}')
+        lines.append(f'fhl_span_seconds_bucket{{{labels},le="+Inf"}} {totals["count"]}')
+        lines.append(f"fhl_span_seconds_sum{{{labels}}} {totals['sum']:.6f}")
+        lines.append(f"fhl_span_seconds_count{{{labels}}} {totals['count']}")
+    for field, help_text in [("round_trips", "Requests sent to the backend."),
+                             ("rows", "Rows received from the backend."),
+                             ("bytes", "Response bytes received from the backend."),
+                             ("retries", "Requests retried after a transient failure."),
+                             ("errors", "Spans that ended in an exception.")]:
+        lines += [f"# HELP fhl_{field}_total {help_text}", f"# TYPE fhl_{field}_total counter"]
+        for (kind, name, table), totals in items:
+            labels = f'kind="{_label(kind)}",name="{_label(name)}",table="{_label(table)}"'
+            lines.append(f"fhl_{field}_total{{{labels}}} {totals[field]}")
+    lines += _connection_lines()
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics on host:port from a daemon thread; once per process."""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
+
+
+# --- Developer panel ---
+def session_spans(clear=False) -> list:
+    """The spans recorded for this session since the last clear."""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return []
+    with _lock:
+        spans = _sessions.get(ctx.session_id, deque())
+        records = list(spans)
+        if clear:
+            spans.clear()
+    return records
+
+def panel(enabled=False):
+    """
+    Show this rerun's spans in the sidebar (when enabled, or with ?dev=1 in
+    the URL), then start the next rerun's list.
+    """
+    records = session_spans(clear=True)
+    if not (enabled or st.query_params.get("dev") == "1"):
+        return
+    with st.sidebar.expander("⏱ Timings (this rerun)", expanded=True):
+        pool = _connections.snapshot() if _connections is not None else None
+        if pool and pool["requests"]:
+            st.caption(f"HTTP pool since start: {pool['requests']} requests over {pool['connections']} "
+                       f"connections, {pool['reuse_ratio']:.0%} reused")
+        if not records:
+            st.caption("No spans recorded.")
+            return
+        df = pd.DataFrame(records).sort_values("started")
+        db = df[(df["kind"] == "db") & ~df["nested"]]
+        st.caption(f"{len(db)} db calls, {int(db['round_trips'].sum())} round trips, "
+                   f"{int(db['rows'].sum())} rows, {db['bytes'].sum() / 1024:.0f} KiB, "
+                   f"{db['seconds'].sum() * 1000:.0f} ms")
+        df["span"] = ["  " * depth + name for depth, name in zip(df["depth"], df["name"])]
+        df["ms"] = (df["seconds"] * 1000).round(1)
+        st.dataframe(df[["span", "kind", "table", "filters", "ms", *IO_FIELDS, "error"]].astype({"filters": str}),
+                     hide_index=True, width="stretch")
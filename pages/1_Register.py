@@ -1,5 +1,6 @@
 import streamlit as st
 import db_utils
+import metrics
 
 st.title("📋 Register Your Team")
 
@@ -18,3 +19,4 @@ if st.button("Register"):
             db_utils.add_team(team_name, manager)
             st.success(f"✅ Team **{team_name}** registered successfully!")
 
+metrics.panel(db_utils.DEV_PANEL)
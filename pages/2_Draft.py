@@ -1,12 +1,19 @@
 import streamlit as st
 import pandas as pd
 import db_utils
-from streamlit_autorefresh import st_autorefresh
+import metrics
+import rosters
+from registry import registry_for
 
 st.title("🏒 Fantasy Draft Room")
 
-# --- Auto-refresh every 5 seconds ---
-st_autorefresh(interval=100000, key="draft_autorefresh")
+# --- Change feed: poll the draft version, rerun only after a pick ---
+DRAFT_POLL_SECONDS = 3
+
+@st.fragment(run_every=DRAFT_POLL_SECONDS)
+def watch_draft(seen_version):
+    if db_utils.draft_version() != seen_version:
+        st.rerun()
 
 # --- Load teams ---
 if "teams" not in st.session_state:
@@ -18,20 +25,25 @@ if teams.empty:
 
 # --- Load draft board ---
 def load_draft_board():
-    df = db_utils.load_draft_board()
+    df = db_utils.load_draft_board(incremental=True)
     if df is None or df.empty:
         df = pd.DataFrame(columns=["Round", "Pick", "Name", "team", "Pos.", "FantasyTeam"])
     return df.sort_values(by=["Round", "Pick"])
 
-st.session_state.draft_board = load_draft_board()
+# --- Load board and players, again only when the draft version moved ---
+# The version is read first, so a pick landing mid-load is picked up next poll
+draft_version = db_utils.draft_version()
+if st.session_state.get("draft_seen_version") != draft_version or "draft_players" not in st.session_state:
+    st.session_state.draft_board = load_draft_board()
+    # Delta syncs: only the changed picks and players are fetched
+    players = db_utils.load_players(incremental=True)
+    stats = db_utils.load_last_week_stats()
+    st.session_state.draft_players = pd.merge(players, stats, on = ['Name', 'team'], how = 'left')
+    st.session_state.draft_seen_version = draft_version
 draft_board = st.session_state.draft_board
-
-
-# --- Load players ---
-st.session_state.players = db_utils.load_players()
-players = st.session_state.players
-stats = db_utils.load_last_week_stats()
-players = pd.merge(players, stats, on = ['Name', 'team'], how = 'left')
+players = st.session_state.draft_players
+registry = registry_for(players, st.session_state, key="draft_registry")
+watch_draft(draft_version)
 
 # --- Determine current pick ---
 next_pick_row = draft_board[draft_board["Name"].isna()].head(1)
@@ -68,7 +80,7 @@ st.subheader("Available Players")
 if available_players.empty:
     st.warning("No available players left!")
 else:
-    st.dataframe(available_players.drop('held_by', axis=1).set_index(['Name', 'Pos.', 'team']), width='stretch')
+    st.dataframe(available_players.drop(['held_by', 'updated_at'], axis=1, errors='ignore').set_index(['Name', 'Pos.', 'team']), width='stretch')
 
 # --- Draft Controls ---
 st.subheader("Draft Controls")
@@ -84,86 +96,61 @@ else:
     can_draft = (selected_team == next_team_to_pick)
 
 if can_draft:
-    available_players["label"] = available_players.apply(
-        lambda row: f"{row['Name']} — {row['Pos.']} — {row['team']}", axis=1
-    )
-    label_to_name = dict(zip(available_players["label"], available_players["Name"]))
+    # Rows of players are registry ids
+    label_to_id = {registry.label(i, sep=" — "): i for i in available_players.index}
 
     selected_label = st.selectbox(
         f"{selected_team}, select a player to draft:",
-        options=available_players["label"].tolist(),
+        options=list(label_to_id),
         key="player_select_dropdown"
     )
-    chosen_player = label_to_name[selected_label]
+    chosen_id = label_to_id[selected_label]
+    chosen_player = registry.get(chosen_id, "Name")
 
     if st.button("Draft Player", key="draft_player_button"):
-        # --- Update players ---
-        idx_players = players["Name"] == chosen_player
-        players.loc[idx_players, "held_by"] = selected_team
-        st.session_state.players = players.copy()
-
-        # --- Get player info ---
-        player_info = players.loc[idx_players].iloc[0]
-
-        # --- Update DraftBoard in session state ---
-        idx_board = (draft_board["Round"] == next_pick_row.iloc[0]["Round"]) & \
-                    (draft_board["Pick"] == next_pick_row.iloc[0]["Pick"])
-        draft_board.loc[idx_board, ["Name", "Pos.", "team", "FantasyTeam"]] = [
-            player_info["Name"],
-            player_info["Pos."],
-            player_info["team"],
-            selected_team
-        ]
-        st.session_state.draft_board = draft_board.copy()
-
-        # --- Update DraftBoard in Supabase ---
-        db_utils.update_draft_pick_full(
-            round_number=next_pick_row.iloc[0]["Round"],
-            pick_number=next_pick_row.iloc[0]["Pick"],
-            name=player_info["Name"],
-            pos=player_info["Pos."],
-            team=player_info["team"],
-            fantasy_team=selected_team
-        )
-        db_utils.save_player(players[['Name', 'team', 'Yr.', 'Pos.', 'Ht.', 'Wt.', 'YOB', 'Hometown', 'Last Team', 'Draft Year', 'Draft Team', 'Draft Round', 'held_by']].loc[idx_players].iloc[0])
-
-        st.success(f"{selected_team} drafted {chosen_player}!")
+        # --- Make the pick: the server checks the turn and the player ---
+        try:
+            pick = db_utils.make_pick(
+                round_number=next_pick_row.iloc[0]["Round"],
+                pick_number=next_pick_row.iloc[0]["Pick"],
+                fantasy_team=selected_team,
+                name=chosen_player,
+                team=registry.get(chosen_id, "team")
+            )
+        except db_utils.PickRejected as e:
+            # This session's board or players were stale: reload them next run
+            st.session_state.draft_seen_version = None
+            st.error(f"Pick not made ({e.reason}): {e}")
+        else:
+            # --- Update players ---
+            registry.scatter([chosen_id], "held_by", selected_team)
+            st.session_state.draft_players = registry.frame()
+
+            # --- Update DraftBoard in session state ---
+            idx_board = (draft_board["Round"] == pick["Round"]) & (draft_board["Pick"] == pick["Pick"])
+            draft_board = draft_board.astype({"Pos.": object, "team": object, "FantasyTeam": object})
+            draft_board.loc[idx_board, ["Name", "Pos.", "team", "FantasyTeam"]] = [
+                pick["Name"],
+                pick["Pos."],
+                pick["team"],
+                pick["FantasyTeam"]
+            ]
+            st.session_state.draft_board = draft_board.copy()
+
+            st.success(f"{selected_team} drafted {chosen_player}!")
 else:
     if not next_pick_row.empty:
         st.info(f"It is not your turn. Next pick: {next_pick_row.iloc[0]['FantasyTeam']}")
 
 # --- Roster Display ---
 st.subheader(f"{selected_team} Roster")
-roster_template = {"F": 6, "D": 4, "G": 2}
-num_bench = 5
-
-def build_team_roster(players, team_name):
-    my_team_players = players[players["held_by"] == team_name]
-    roster_rows = []
-    for pos, slots in roster_template.items():
-        for _ in range(slots):
-            roster_rows.append({"Pos.": pos, "Name": "---", "team": "---", "Yr.": "---", "Ht.": "---", "Wt.": "---"})
-    for _ in range(num_bench):
-        roster_rows.append({"Pos.": "Bench", "Name": "---", "team": "---", "Yr.": "---", "Ht.": "---", "Wt.": "---"})
-    my_roster = pd.DataFrame(roster_rows)
-    pos_counts = {pos: 0 for pos in roster_template.keys()}
-
-    for _, row in my_team_players.iterrows():
-        pos = row["Pos."]
-        if pos in roster_template and pos_counts[pos] < roster_template[pos]:
-            index = sum([roster_template[p] for p in roster_template
-                         if list(roster_template.keys()).index(p) < list(roster_template.keys()).index(pos)]) + pos_counts[pos]
-            my_roster.loc[index, ["Name", "team", "Yr.", "Ht.", "Wt."]] = row[["Name", "team", "Yr.", "Ht.", "Wt."]]
-            pos_counts[pos] += 1
-        else:
-            for i in range(len(my_roster)):
-                if my_roster.loc[i, "Pos."].startswith("Bench") and my_roster.loc[i, "Name"] == "---":
-                    my_roster.loc[i, "Pos."] = f"Bench - {pos}"
-                    my_roster.loc[i, ["Name", "team", "Yr.", "Ht.", "Wt."]] = row[["Name", "team", "Yr.", "Ht.", "Wt."]]
-                    break
-    return my_roster
-
-team_roster = build_team_roster(players, selected_team)
+
+@metrics.traced(kind="section")
+def build_team_roster(registry, team_name):
+    my_team_players = registry.gather(registry.where("held_by", team_name))
+    return rosters.build_roster(my_team_players, team_name, ["Name", "team", "Yr.", "Ht.", "Wt."])
+
+team_roster = build_team_roster(registry, selected_team)
 st.table(team_roster)
 
 
@@ -175,4 +162,6 @@ if not draft_board.empty:
         width='stretch'
     )
 else:
-    st.info("No players have been drafted yet.")
\ No newline at end of file
+    st.info("No players have been drafted yet.")
+
+metrics.panel(db_utils.DEV_PANEL)
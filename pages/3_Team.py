@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 import db_utils
+import metrics
+import rosters
+from registry import registry_for
 import time
 import numpy as np
 
@@ -21,22 +24,6 @@ if teams.empty:
     st.warning("No teams registered yet.")
     st.stop()
 
-# --- Load players & points only once ---
-if "players" not in st.session_state:
-    players = db_utils.load_players()
-    points = db_utils.load_points()
-    weekly = points[points['Week'] == max(points['Week'])][['Name', 'team', 'FantasyPoints', 'Week']]
-    weekly_total = weekly.pivot_table(columns='Week', index=['Name','team'], values='FantasyPoints', aggfunc='sum')
-    weekly_total['WeeklyPts'] = weekly_total.sum(axis=1)
-    total = points.pivot_table(columns='Week', index=['Name','team'], values='FantasyPoints', aggfunc='sum')
-    total['CumulativePts'] = total.sum(axis=1)
-    total = total.reset_index()[['Name','team','CumulativePts']]
-    players = pd.merge(players, weekly_total, on=['Name','team'], how='left')
-    players = pd.merge(players, total, on=['Name','team'], how='left')
-    st.session_state['players'] = players
-else:
-    players = st.session_state.players
-
 # --- Select your team ---
 selected_team = st.selectbox(
     "Select your team:", 
@@ -45,46 +32,32 @@ selected_team = st.selectbox(
 )
 st.session_state.team_name = selected_team
 
+# --- Load this team's players & points once per team ---
+if st.session_state.get("players_team") != selected_team:
+    players = db_utils.load_players(columns=['Name', 'team', 'Pos.', 'held_by'], held_by=selected_team)
+    keys = list(zip(players['Name'], players['team']))
+    weekly_total = db_utils.load_player_week_points(week=db_utils.latest_week(), players=keys)[['Name', 'team', 'WeeklyPts']]
+    total = db_utils.load_player_season_points(columns=['Name', 'team', 'CumulativePts'], players=keys)
+    players = pd.merge(players, weekly_total, on=['Name','team'], how='left')
+    players = pd.merge(players, total, on=['Name','team'], how='left')
+    st.session_state['players'] = players
+    st.session_state['players_team'] = selected_team
+else:
+    players = st.session_state.players
+registry = registry_for(players, st.session_state, key="team_registry")
+
 # --- Build roster function ---
-def build_roster(players_df, team_name):
-    roster_template = {"F": 6, "D": 4, "G": 2}
-    num_bench = 5
-    team_players = players_df[players_df["held_by"] == team_name].copy()
-
-    # Create roster placeholders
-    roster_rows = []
-    for pos, slots in roster_template.items():
-        for _ in range(slots):
-            roster_rows.append({"Pos.": pos, "Name": "---", "team": "---", "WeeklyPts": "---", "CumulativePts": "---"})
-    for _ in range(num_bench):
-        roster_rows.append({"Pos.": "Bench", "Name": "---", "team": "---", "WeeklyPts": "---", "CumulativePts": "---"})
-    my_roster = pd.DataFrame(roster_rows)
-
-    # Counters for starters per position
-    pos_counts = {pos: 0 for pos in roster_template.keys()}
-    bench_index = sum(roster_template.values())
-
-    for _, row in team_players.iterrows():
-        pos = row["Pos."]
-        if pos in roster_template and pos_counts[pos] < roster_template[pos]:
-            start_index = sum(
-                roster_template[p] for p in list(roster_template.keys())
-                if list(roster_template.keys()).index(p) < list(roster_template.keys()).index(pos)
-            )
-            my_roster.loc[start_index + pos_counts[pos], ["Name", "team", "WeeklyPts", "CumulativePts"]] = row[
-                ["Name", "team", "WeeklyPts", "CumulativePts"]
-            ]
-            pos_counts[pos] += 1
-        else:
-            # Fill bench sequentially
-            my_roster.loc[bench_index, ["Pos.", "Name", "team", "WeeklyPts", "CumulativePts"]] = [
-                f"Bench - {pos}", row["Name"], row["team"], row["WeeklyPts"], row["CumulativePts"]
-            ]
-            bench_index += 1
-    return my_roster
+@metrics.traced(kind="section")
+def build_roster(registry, team_name):
+    team_players = registry.gather(registry.where("held_by", team_name))
+    return rosters.build_roster(team_players, team_name, ["Name", "team", "WeeklyPts", "CumulativePts"])
+
+# Points to one decimal; empty slots keep their placeholder
+def format_points(value):
+    return value if isinstance(value, str) else f"{value:.1f}"
 
 # --- Build roster for selected team ---
-st.session_state.roster = build_roster(st.session_state.players, selected_team)
+st.session_state.roster = build_roster(registry, selected_team)
 st.session_state.starters = st.session_state.roster[~st.session_state.roster["Pos."].str.startswith("Bench") & 
                                                    (st.session_state.roster["Name"] != "---")]
 st.session_state.bench = st.session_state.roster[st.session_state.roster["Pos."].str.startswith("Bench") & 
@@ -93,7 +66,7 @@ st.session_state.bench = st.session_state.roster[st.session_state.roster["Pos."]
 # --- Display roster ---
 st.subheader(f"{selected_team}'s Roster")
 roster_placeholder = st.empty()
-roster_placeholder.table(st.session_state.roster.style.format({"WeeklyPts": "{:.1f}", "CumulativePts": "{:.1f}"}, na_rep = '0'))
+roster_placeholder.table(st.session_state.roster.style.format({"WeeklyPts": format_points, "CumulativePts": format_points}, na_rep = '0'))
 
 # --- Week selection ---
 weeks = list(range(3, 16))
@@ -132,43 +105,49 @@ if st.button("Submit Players"):
 
 # --- Swap Players ---
 st.subheader("Swap Players (Starters ↔ Bench)")
-if "swap1" not in st.session_state: st.session_state.swap1 = ""
-if "swap2" not in st.session_state: st.session_state.swap2 = ""
+if "swap1" not in st.session_state: st.session_state.swap1 = None
+if "swap2" not in st.session_state: st.session_state.swap2 = None
+
+def player_name(player_id):
+    return "" if player_id is None else registry.get(player_id, "Name")
+
+# Options are registry ids, so players who share a name stay distinct
+starter_ids = registry.ids(zip(st.session_state.starters["Name"], st.session_state.starters["team"])).tolist()
+bench_ids = registry.ids(zip(st.session_state.bench["Name"], st.session_state.bench["team"])).tolist()
 
 # Starter selection
-swap1_options = [""] + st.session_state.starters["Name"].tolist()
-swap1_index = swap1_options.index(st.session_state.swap1) if st.session_state.swap1 in st.session_state.starters["Name"].tolist() else 0
-st.session_state.swap1 = st.selectbox("Select Starter to swap out", swap1_options, index=swap1_index)
+swap1_options = [None] + starter_ids
+swap1_index = swap1_options.index(st.session_state.swap1) if st.session_state.swap1 in starter_ids else 0
+st.session_state.swap1 = st.selectbox("Select Starter to swap out", swap1_options, index=swap1_index, format_func=player_name)
 
 # Bench selection filtered by position
-if st.session_state.swap1:
-    pos1 = st.session_state.roster.loc[st.session_state.roster["Name"] == st.session_state.swap1, "Pos."].values[0]
-    swap2_list = st.session_state.bench[st.session_state.bench["Pos."].str.endswith(pos1)]["Name"].tolist()
+if st.session_state.swap1 is not None:
+    pos1 = registry.get(st.session_state.swap1, "Pos.")
+    swap2_list = [i for i in bench_ids if registry.get(i, "Pos.") == pos1]
 else:
     swap2_list = []
 
-swap2_options = [""] + swap2_list
+swap2_options = [None] + swap2_list
 swap2_index = swap2_options.index(st.session_state.swap2) if st.session_state.swap2 in swap2_list else 0
-st.session_state.swap2 = st.selectbox("Select Bench player to swap in", swap2_options, index=swap2_index)
+st.session_state.swap2 = st.selectbox("Select Bench player to swap in", swap2_options, index=swap2_index, format_func=player_name)
 
 # Swap action
-if st.button("Swap Players") and st.session_state.swap1 and st.session_state.swap2:
-    idx1 = st.session_state.players.index[st.session_state.players["Name"] == st.session_state.swap1][0]
-    idx2 = st.session_state.players.index[st.session_state.players["Name"] == st.session_state.swap2][0]
+if st.button("Swap Players") and st.session_state.swap1 is not None and st.session_state.swap2 is not None:
+    idx1 = st.session_state.swap1
+    idx2 = st.session_state.swap2
 
     # Swap rows
-    st.session_state.players.loc[[idx1, idx2]] = st.session_state.players.loc[[idx2, idx1]].values
+    registry.swap(idx1, idx2)
 
     # Fix positions
-    pos1 = st.session_state.players.loc[idx1, "Pos."]
-    pos2 = st.session_state.players.loc[idx2, "Pos."]
+    pos1 = registry.get(idx1, "Pos.")
+    pos2 = registry.get(idx2, "Pos.")
     base_pos = pos1 if not pos1.startswith("Bench") else pos2.split("Bench - ")[-1]
-    st.session_state.players.loc[idx1, "Pos."] = base_pos
-    st.session_state.players.loc[idx2, "Pos."] = base_pos
+    registry.scatter([idx1, idx2], "Pos.", base_pos)
 
     # Rebuild roster
-    st.session_state.roster = build_roster(st.session_state.players, selected_team)
-    roster_placeholder.table(st.session_state.roster.style.format({"WeeklyPts": "{:.1f}", "CumulativePts": "{:.1f}"}, na_rep = '0'))
+    st.session_state.roster = build_roster(registry, selected_team)
+    roster_placeholder.table(st.session_state.roster.style.format({"WeeklyPts": format_points, "CumulativePts": format_points}, na_rep = '0'))
 
     # Update starters and bench
     st.session_state.starters = st.session_state.roster[~st.session_state.roster["Pos."].str.startswith("Bench") &
@@ -177,5 +156,7 @@ if st.button("Swap Players") and st.session_state.swap1 and st.session_state.swa
                                                      (st.session_state.roster["Name"] != "---")]
 
     # Reset selections
-    st.session_state.swap1 = ""
-    st.session_state.swap2 = ""
+    st.session_state.swap1 = None
+    st.session_state.swap2 = None
+
+metrics.panel(db_utils.DEV_PANEL)
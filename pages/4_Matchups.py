@@ -1,13 +1,13 @@
 import streamlit as st
 import db_utils
+import metrics
+import league
 
 st.title("📅 Matchups")
 
 # --- Load matchups ---
 matchups_df = db_utils.load_matchups()
 managers = db_utils.load_teams()
-rosters_df = db_utils.load_roster()
-points = db_utils.load_points()
 
 matchups_df = (
         matchups_df
@@ -17,46 +17,14 @@ matchups_df = (
 
 selected_week = st.selectbox("Select week", sorted(matchups_df["week"].unique()))
 week_matchups = matchups_df[matchups_df["week"] == selected_week]
-week_rosters = rosters_df[rosters_df['week'] == selected_week]
-week_points = points[points['Week'] == selected_week]
-
-weekly = points[points['Week'] == selected_week][['Name', 'team', 'FantasyPoints', 'Week']]
-weekly_total = weekly.pivot_table(columns='Week', index=['Name','team'], values='FantasyPoints', aggfunc='sum')
-weekly_total['points'] = round(weekly_total.sum(axis=1), 1)
-weekly_total = weekly_total.reset_index()[['Name', 'team', 'points']]
-
-if len(week_points) != 0:
-    week_rosters = week_rosters.merge(weekly_total.rename(columns = {'Name' : 'player_name'}), on = ['player_name', 'team'], how = 'left')
-else:
-    week_rosters['points'] = [0] * len(week_rosters)
-
-# Initialize new columns
-week_matchups["home_team_points"] = 0.0
-week_matchups["away_team_points"] = 0.0
-
-# Loop through each matchup and sum starter points
-for idx, row in week_matchups.iterrows():
-    home_team = row["home_team"]
-    away_team = row["away_team"]
-
-    home_points = (
-        week_rosters
-        .query("team_name == @home_team and player_pos == 'starter'")
-        ["points"]
-        .fillna(0)
-        .sum()
-    )
 
-    away_points = (
-        week_rosters
-        .query("team_name == @away_team and player_pos == 'starter'")
-        ["points"]
-        .fillna(0)
-        .sum()
-    )
+# --- Only this week's lineups and points ---
+week_rosters = db_utils.load_roster(week=selected_week)
+week_points = db_utils.load_player_week_points(week=selected_week)
 
-    week_matchups.loc[idx, "home_team_points"] = round(home_points, 1)
-    week_matchups.loc[idx, "away_team_points"] = round(away_points, 1)
+# Starter totals for every matchup this week
+with metrics.span("score matchups"):
+    week_matchups, week_rosters = league.score_matchups(week_matchups, week_rosters, week_points)
 
 st.dataframe(week_matchups.set_index('week').drop(['manager_1', 'manager_2'], axis = 1)[['home_team', 'away_team', 'home_team_points', 'away_team_points']])
 
@@ -124,4 +92,6 @@ with col2:
     st.dataframe(team2_starters[["player_name", "Pos.", 'team', 'points']], hide_index=True, height = 460)
     st.divider()
     st.caption("Bench")
-    st.dataframe(team2_bench[["player_name", "Pos.", 'team', 'points']], hide_index=True)
\ No newline at end of file
+    st.dataframe(team2_bench[["player_name", "Pos.", 'team', 'points']], hide_index=True)
+
+metrics.panel(db_utils.DEV_PANEL)
@@ -1,25 +1,40 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import time
 import db_utils
-from streamlit_autorefresh import st_autorefresh
+import metrics
+import rosters
+from registry import registry_for
 
 st.title("🏒Add / Drop Players")
 
-# --- Auto-refresh every 5 seconds ---
-st_autorefresh(interval=100000, key="players_autorefresh")
+# --- Auto-refresh: rerun the page every PLAYERS_REFRESH_SECONDS ---
+PLAYERS_REFRESH_SECONDS = 100
+
+@st.fragment(run_every=PLAYERS_REFRESH_SECONDS)
+def refresh_players(rendered_at):
+    # The first call runs with the page itself; only the timed ones rerun it
+    if time.monotonic() - rendered_at >= PLAYERS_REFRESH_SECONDS - 1:
+        st.rerun()
+
+refresh_players(time.monotonic())
 
 # --- Load data ---
 teams = db_utils.load_teams()
 players = db_utils.load_players()
-points = db_utils.load_points()
+# The registry holds the players table only, so its version follows that
+# table; stats and points change on their own and are joined on every run
+registry = registry_for(players, st.session_state, key="players_registry")
+
 stats = db_utils.load_last_week_stats()
 players = pd.merge(players, stats, on = ['Name', 'team'], how = 'left')
 
-total = points.pivot_table(columns='Week', index=['Name','team'], values='FantasyPoints', aggfunc='sum')
-total['CumulativePts'] = round(total.sum(axis=1), 1)
-total = total.reset_index()[['Name','team','CumulativePts']]
+total = db_utils.load_player_season_points(columns=['Name', 'team', 'CumulativePts'])
+total['CumulativePts'] = round(total['CumulativePts'], 1)
 players = pd.merge(players, total, on=['Name','team'], how='left')
+# Left merges on a unique key keep the row order, so rows are registry ids
+details = players.columns.difference(registry.columns, sort=False)
 
 if teams.empty:
     st.warning("No teams registered yet.")
@@ -28,47 +43,27 @@ if teams.empty:
 # --- Select your team ---
 my_team_name = st.selectbox("Select your team:", teams["team_name"])
 
-# --- Roster template for validation ---
-roster_template = {"F": 6, "D": 4, "G": 2}
-num_bench = 5
-
+@metrics.traced(kind="section")
 def build_roster_display(team_name):
     """Builds the current roster table with starters and bench labeled"""
-    team_players = players[players["held_by"] == team_name]
-    roster_display = []
-
-    # Starting players
-    for pos, slots in roster_template.items():
-        starters = team_players[team_players["Pos."] == pos].head(slots)
-        for _, row in starters.iterrows():
-            roster_display.append(row)
-
-    # Bench players
-    for pos in roster_template.keys():
-        extra = team_players[team_players["Pos."] == pos].iloc[roster_template[pos]:]
-        for _, row in extra.iterrows():
-            bench_row = row.copy()
-            bench_row["Pos."] = f"Bench - {row['Pos.']}"
-            roster_display.append(bench_row)
-
-    display_df = pd.DataFrame(roster_display)
-    if not display_df.empty:
-        display_df = display_df
-    return display_df
+    ids = registry.where("held_by", team_name)
+    team_players = registry.gather(ids).join(players.loc[ids, details])
+    return rosters.assign_slots(team_players).drop(columns="slot")
 
 # --- Display current roster ---
 st.subheader(f"{my_team_name}'s Current Roster")
 display_df = build_roster_display(my_team_name)
-st.dataframe(display_df.set_index(['Name', 'team', 'Pos.']).drop(['held_by'], axis = 1),
+st.dataframe(display_df.set_index(['Name', 'team', 'Pos.']).drop(['held_by', 'updated_at'], axis = 1, errors = 'ignore'),
              height=500, use_container_width=True, width = 'stretch')
 
 # --- Free agents ---
+@metrics.traced(kind="section")
 def get_free_agents():
     return players[players["held_by"].isna()]
 
 st.subheader("Available Free Agents")
 free_agents = get_free_agents()
-st.dataframe(free_agents.set_index(['Name', 'team', 'Pos.']).drop(['held_by'], axis = 1),
+st.dataframe(free_agents.set_index(['Name', 'team', 'Pos.']).drop(['held_by', 'updated_at'], axis = 1, errors = 'ignore'),
              height=500, use_container_width=True, width = 'stretch')
 
 # --- Initialize session state for selections ---
@@ -80,19 +75,22 @@ if "drop_player" not in st.session_state:
 # --- Function to build display strings ---
 def format_options(df):
     df = df.copy()
-    df["display"] = df["Name"] + " - " + df["Pos."] + " - " + df["team"]
+    df["display"] = df["Name"] + " - " + df["Pos."].astype(str) + " - " + df["team"].astype(str)
     return df
 
 # --- Add Player dropdown ---
+# Rows of players are registry ids
 add_df = format_options(free_agents)
+add_ids = dict(zip(add_df["display"], add_df.index))
 add_options = [""] + add_df["display"].tolist()
 add_index = add_options.index(st.session_state.add_player) if st.session_state.add_player in add_options else 0
 selected_add_display = st.selectbox("Select a player to add:", add_options, index=add_index)
 st.session_state.add_player = selected_add_display
 
 # --- Drop Player dropdown ---
-team_players = players[players["held_by"] == my_team_name]
+team_players = players.loc[registry.where("held_by", my_team_name)]
 drop_df = format_options(team_players)
+drop_ids = dict(zip(drop_df["display"], drop_df.index))
 drop_options = [""] + drop_df["display"].tolist()
 drop_index = drop_options.index(st.session_state.drop_player) if st.session_state.drop_player in drop_options else 0
 selected_drop_display = st.selectbox("Select a player to drop from your roster:", drop_options, index=drop_index)
@@ -103,37 +101,38 @@ if st.button("Add & Drop Player"):
     if not st.session_state.add_player or not st.session_state.drop_player:
         st.warning("Please select both a player to add and a player to drop.")
     else:
-        # Map display string back to Name
-        add_name = st.session_state.add_player.split(" - ")[0]
-        drop_name = st.session_state.drop_player.split(" - ")[0]
+        # Map display string back to the player
+        add_id = add_ids[st.session_state.add_player]
+        drop_id = drop_ids[st.session_state.drop_player]
+        add_name = registry.get(add_id, "Name")
+        drop_name = registry.get(drop_id, "Name")
 
         # Get positions
-        pos_add = players.loc[players["Name"] == add_name, "Pos."].values[0]
-        pos_drop = players.loc[players["Name"] == drop_name, "Pos."].values[0]
+        pos_add = registry.get(add_id, "Pos.")
+        pos_drop = registry.get(drop_id, "Pos.")
 
         # Count current players at that position
-        current_count = len(players[(players["held_by"] == my_team_name) & (players["Pos."] == pos_add)])
+        current_count = len(np.intersect1d(registry.where("held_by", my_team_name), registry.where("Pos.", pos_add)))
         if pos_add == pos_drop:
             current_count -= 1
 
         # Bench-aware roster limit
-        max_allowed = roster_template.get(pos_add, 0) + num_bench
+        max_allowed = rosters.ROSTER_TEMPLATE.get(pos_add, 0) + rosters.BENCH_SLOTS
 
         if current_count >= max_allowed:
             st.warning(f"No available {pos_add} slots (including bench). Choose a different player to drop.")
         else:
-            # Perform add/drop
-            players.loc[players["Name"] == add_name, "held_by"] = my_team_name
-            players.loc[players["Name"] == drop_name, "held_by"] = None
-            players = players.replace({np.nan: None, np.inf: None, -np.inf: None})
-
-            idx_add_players = players["Name"] == add_name
-            idx_drop_players = players["Name"] == drop_name
-
-            db_utils.save_player(players[['Name', 'team', 'Yr.', 'Pos.', 'Ht.', 'Wt.', 'YOB', 'Hometown', 'Last Team', 'Draft Year', 'Draft Round', 'Draft Team', 'held_by']].loc[idx_add_players].iloc[0])
-            db_utils.save_player(players[['Name', 'team', 'Yr.', 'Pos.', 'Ht.', 'Wt.', 'YOB', 'Hometown', 'Last Team', 'Draft Year', 'Draft Round', 'Draft Team', 'held_by']].loc[idx_drop_players].iloc[0])
+            # Perform add/drop; the registry follows once each write returns
+            player_cols = ['Name', 'team', 'Yr.', 'Pos.', 'Ht.', 'Wt.', 'YOB', 'Hometown', 'Last Team', 'Draft Year', 'Draft Round', 'Draft Team', 'held_by']
+            for player_id, held_by in [(add_id, my_team_name), (drop_id, None)]:
+                row = registry.row(player_id, player_cols)
+                row["held_by"] = held_by
+                db_utils.save_player(row)
+                registry.scatter([player_id], "held_by", held_by)
             st.success(f"Added {add_name} and dropped {drop_name}")
 
             # Clear selections
             st.session_state.add_player = ""
             st.session_state.drop_player = ""
+
+metrics.panel(db_utils.DEV_PANEL)
@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
 import db_utils
+import metrics
 
 st.title("🏆 Standings")
 
 standings = db_utils.load_teams()
 
 st.dataframe(standings[['Place', 'team_name', 'manager', 'W', 'L', 'PF', 'PA']], hide_index = True, height = 460)
+
+metrics.panel(db_utils.DEV_PANEL)
@@ -0,0 +1,174 @@
+# pipeline.py
+"""
+Batch jobs for the Commissioner tools: streaming weekly scoring and the
+whole-season recompute.
+
+In weekly scoring each college team is scraped, diffed against its own slice of the
+last_week_stats baseline and scored as soon as its page arrives; points and
+the changed baseline rows are written in bounded chunks while later teams are
+still downloading. The new baseline is staged as a snapshot and only becomes
+current once every point has been written.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+import db_utils
+import league
+import scraper
+from scoring import compute_fantasy_points
+
+WRITE_CHUNK_ROWS = 500   # rows buffered per table before a write
+PREVIEW_ROWS = 50        # scored rows kept for display
+
+class ChunkWriter:
+    """Buffers frames and passes them to a write function once chunk_rows are pending."""
+
+    def __init__(self, write, chunk_rows=WRITE_CHUNK_ROWS):
+        self.write = write
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self._buffer = []
+        self._pending = 0
+
+    def add(self, df):
+        if df.empty:
+            return
+        self._buffer.append(df)
+        self._pending += len(df)
+        if self._pending >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        chunk = pd.concat(self._buffer)
+        self._buffer, self._pending = [], 0
+        self.write(chunk)
+        self.rows_written += len(chunk)
+
+def diff_team(current, baseline):
+    """This week's stats for one team: cumulative minus the baseline slice."""
+    baseline = baseline.reindex(columns=current.columns)
+    return (current - baseline).fillna(0.0)
+
+def _process_team(fetcher, team, score, snapshot):
+    current = scraper.scrape_team(fetcher, team)
+    baseline = db_utils.load_team_baseline(team)
+    points = None
+    if score:
+        weekly = diff_team(current, baseline)
+        scored = compute_fantasy_points(weekly).reset_index()
+        points = scored.loc[scored['FantasyPoints'] != 0, ['Name', 'team', 'FantasyPoints']]
+    changes = snapshot.changes(current, baseline) if snapshot else None
+    return changes, points
+
+def run_weekly_scoring(week=None, day=None, teams=None, fetcher=None, score=True, save=True,
+                       max_workers=scraper.MAX_CONNECTIONS, chunk_rows=WRITE_CHUNK_ROWS, on_team=None):
+    """
+    Score every college team for one day and roll the baseline forward.
+
+    score=False only refreshes the baseline (the off-week run); save=False
+    computes everything without writing. on_team(team, error) is called as
+    each team finishes. Returns a summary dict with the teams done, the
+    failures, the rows written and a preview of the scored rows.
+    """
+    fetcher = fetcher or scraper.default_fetcher()
+    if teams is None:
+        teams = [team[:-1] for team in scraper.get_team_names(fetcher).Name]
+
+    # Staged baseline rows stay invisible until commit, so they can be written
+    # in any order relative to the points computed from the old baseline
+    snapshot = db_utils.BaselineSnapshot() if save else None
+    points_writer = ChunkWriter(lambda df: db_utils.save_weekly_points(df, week, day, snapshot.version), chunk_rows)
+    closed_writer = ChunkWriter(lambda df: snapshot.write_closed(df), chunk_rows)
+    opened_writer = ChunkWriter(lambda df: snapshot.write_opened(df), chunk_rows)
+    summary = {"teams": 0, "failed": {}, "points_rows": 0, "baseline_rows": 0, "preview": []}
+    preview_rows = 0
+
+    try:
+        # Keep only a window of teams in flight so finished results never pile up
+        queue = list(reversed(teams))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            in_flight = {}
+            while queue or in_flight:
+                while queue and len(in_flight) < 2 * max_workers:
+                    team = queue.pop()
+                    in_flight[pool.submit(_process_team, fetcher, team, score, snapshot)] = team
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    team = in_flight.pop(future)
+                    try:
+                        changes, points = future.result()
+                    except Exception as e:
+                        summary["failed"][team] = e
+                        if on_team:
+                            on_team(team, e)
+                        continue
+
+                    if save:
+                        if points is not None:
+                            points_writer.add(points)
+                        closed_writer.add(changes[0])
+                        opened_writer.add(changes[1])
+                    if points is not None and preview_rows < PREVIEW_ROWS:
+                        summary["preview"].append(points.head(PREVIEW_ROWS - preview_rows))
+                        preview_rows += len(summary["preview"][-1])
+                    summary["teams"] += 1
+                    if on_team:
+                        on_team(team, None)
+
+        points_writer.flush()
+        closed_writer.flush()
+        opened_writer.flush()
+    except BaseException:
+        # Nothing was committed: free the staging lease for the next run
+        if snapshot:
+            snapshot.abort()
+        raise
+    if snapshot:
+        snapshot.commit()
+    summary["points_rows"] = points_writer.rows_written
+    summary["baseline_rows"] = opened_writer.rows_written
+    summary["preview"] = pd.concat(summary["preview"]) if summary["preview"] else pd.DataFrame()
+    return summary
+
+
+def recompute_season(save=True):
+    """
+    Rebuild every week's matchup scores, the per-player aggregates and the
+    standings from points, active_roster and matchups in one pass, writing
+    only the rows that changed and deleting aggregate rows of players no
+    longer in points. Returns the number of changed rows per table.
+    """
+    db_utils.invalidate("points", "active_roster", "matchups", "teams",
+                        "player_week_points", "player_season_points")
+    points = db_utils.load_points()
+    matchups = db_utils.load_matchups()
+    teams = db_utils.load_teams()
+    weekly, season, scored, standings = league.recompute_season(
+        points, db_utils.load_roster(), matchups, teams
+    )
+
+    old_weekly, old_season = db_utils.load_player_week_points(), db_utils.load_player_season_points()
+    removed_weekly = league.removed_keys(weekly, old_weekly, ["Name", "team", "Week"])
+    removed_season = league.removed_keys(season, old_season, ["Name", "team"])
+    weekly = league.changed_rows(weekly, old_weekly, ["Name", "team", "Week"], ["WeeklyPts"])
+    season = league.changed_rows(season, old_season, ["Name", "team"], ["CumulativePts"])
+    scored = league.changed_rows(scored, matchups, ["week", "home_team", "away_team"],
+                                 ["home_team_points", "away_team_points"])
+    standings = league.changed_rows(standings, teams, ["team_name"], ["W", "L", "PF", "PA", "Place"])
+
+    if save:
+        db_utils.save_player_points(weekly, season, removed_weekly, removed_season)
+        if not scored.empty:
+            db_utils.save_matchup_scores(scored)
+        if not standings.empty:
+            db_utils.save_standings(standings)
+
+    return {
+        "player_week_points": len(weekly) + len(removed_weekly),
+        "player_season_points": len(season) + len(removed_season),
+        "matchups": len(scored),
+        "teams": len(standings),
+    }
@@ -0,0 +1,83 @@
+# prewarm.py
+"""
+Cold-start prewarm: load the datasets the pages open with into db_utils'
+process-wide caches, in a background thread, so the first page views after a
+deploy or restart read warm memory instead of paging every table in.
+
+db_utils starts it once per Streamlit server process (FHL_PREWARM=off turns
+it off); run() does the same loads in the calling thread and reports where
+the time went.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+import db_utils
+
+logger = logging.getLogger("fhl.prewarm")
+
+@dataclass
+class PrewarmReport:
+    started: float = None
+    finished: float = None
+    seconds: dict = field(default_factory=dict)  # dataset -> load time
+    errors: dict = field(default_factory=dict)   # dataset -> repr of the exception
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+def _first_week():
+    matchups = db_utils.load_matchups()
+    return None if matchups.empty else matchups["week"].min()
+
+# --- Datasets, in load order ---
+# The arguments are the pages' own, so the cache entries filled here are the
+# ones the pages look up. The draft version is left out: its 2s TTL ends
+# before a first page view would read it.
+DATASETS = [
+    ("teams", lambda: db_utils.load_teams()),
+    ("players", lambda: db_utils.load_players()),
+    ("players delta sync", lambda: db_utils.load_players(incremental=True)),
+    ("last_week_stats", lambda: db_utils.load_last_week_stats()),
+    ("draft board delta sync", lambda: db_utils.load_draft_board(incremental=True)),
+    ("season points", lambda: db_utils.load_player_season_points(columns=["Name", "team", "CumulativePts"])),
+    ("matchups", lambda: db_utils.load_matchups()),
+    ("latest week", lambda: db_utils.latest_week()),
+    ("first week rosters", lambda: db_utils.load_roster(week=_first_week())),
+    ("first week points", lambda: db_utils.load_player_week_points(week=_first_week())),
+]
+
+def run(datasets=DATASETS, report=None) -> PrewarmReport:
+    """Load every dataset in this thread; one failing does not stop the rest."""
+    report = report or PrewarmReport()
+    report.started = time.perf_counter()
+    for name, load in datasets:
+        start = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            report.errors[name] = repr(e)
+            logger.warning("prewarm of %s failed: %r", name, e)
+        report.seconds[name] = round(time.perf_counter() - start, 4)
+    report.finished = time.perf_counter()
+    logger.info("%d of %d datasets loaded in %.2fs", len(report.seconds) - len(report.errors), len(datasets),
+                report.finished - report.started)
+    return report
+
+# --- Background start, once per process ---
+_report = None
+_lock = threading.Lock()
+
+def start() -> PrewarmReport:
+    """Start the background prewarm unless it already ran; returns its (live) report."""
+    global _report
+    with _lock:
+        if _report is None:
+            _report = PrewarmReport()
+            threading.Thread(target=run, kwargs={"report": _report}, name="prewarm", daemon=True).start()
+    return _report
+
+def status() -> PrewarmReport:
+    return _report
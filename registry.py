@@ -0,0 +1,96 @@
+# registry.py
+"""
+Player registry: the players table indexed once per data version.
+
+Rows get integer ids (their position), a hash index maps (Name, team) to an
+id, and every column is held as a numpy array, so single lookups are O(1)
+and bulk gathers/scatters are array operations instead of boolean masks
+over the whole frame. Name alone is not a key: two players can share one.
+"""
+import numpy as np
+import pandas as pd
+
+KEY = ["Name", "team"]
+
+class PlayerRegistry:
+    def __init__(self, players: pd.DataFrame, version=None):
+        self.version = version
+        self.columns = list(players.columns)
+        self._arrays = {col: players[col].to_numpy(dtype=object, copy=True) for col in self.columns}
+        self._index = {key: i for i, key in enumerate(zip(self._arrays["Name"], self._arrays["team"]))}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return tuple(key) in self._index
+
+    # --- Lookups ---
+    def id(self, name, team) -> int:
+        return self._index[(name, team)]
+
+    def ids(self, keys) -> np.ndarray:
+        """Ids for an iterable of (Name, team) pairs; KeyError if one is unknown."""
+        return np.fromiter((self._index[tuple(key)] for key in keys), dtype=np.int64)
+
+    def get(self, player_id, column):
+        return self._arrays[column][player_id]
+
+    def row(self, player_id, columns=None) -> pd.Series:
+        columns = columns or self.columns
+        return pd.Series({col: self._arrays[col][player_id] for col in columns}, name=player_id)
+
+    def where(self, column, value) -> np.ndarray:
+        """Ids of the players whose column equals value (None matches missing values)."""
+        values = self._arrays[column]
+        mask = pd.isna(values) if value is None else values == value
+        return np.flatnonzero(mask)
+
+    def label(self, player_id, sep=" - ") -> str:
+        return sep.join(str(self._arrays[col][player_id]) for col in ("Name", "Pos.", "team"))
+
+    # --- Bulk access ---
+    def gather(self, ids, columns=None) -> pd.DataFrame:
+        """The rows for ids, in that order, as a frame indexed by id."""
+        ids = np.asarray(ids, dtype=np.int64)
+        columns = columns or self.columns
+        return pd.DataFrame({col: self._arrays[col][ids] for col in columns}, index=ids)
+
+    def scatter(self, ids, column, values):
+        """Set column for ids to values (a scalar or one value per id)."""
+        if column in KEY:
+            raise ValueError("key columns cannot be scattered; use swap()")
+        self._arrays[column][np.asarray(ids, dtype=np.int64)] = values
+
+    def swap(self, a, b):
+        """Exchange every column of two rows, keeping the (Name, team) index right."""
+        for values in self._arrays.values():
+            values[[a, b]] = values[[b, a]]
+        for player_id in (a, b):
+            self._index[(self._arrays["Name"][player_id], self._arrays["team"][player_id])] = player_id
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self._arrays, columns=self.columns)
+
+
+def data_version(players: pd.DataFrame):
+    """
+    A token that changes whenever the players data does: the columns, the row
+    count and the newest updated_at when the frame has one, otherwise a
+    content hash.
+    """
+    if "updated_at" in players.columns and not players.empty:
+        return tuple(players.columns), len(players), players["updated_at"].max()
+    return tuple(players.columns), len(players), int(pd.util.hash_pandas_object(players, index=False).sum())
+
+def registry_for(players: pd.DataFrame, store, key="player_registry") -> PlayerRegistry:
+    """
+    The registry for players from store (e.g. st.session_state), built again
+    only when the data version differs from the stored one.
+    """
+    version = data_version(players)
+    registry = store.get(key)
+    if registry is None or registry.version != version:
+        registry = PlayerRegistry(players, version)
+        store[key] = registry
+    return registry
@@ -0,0 +1,86 @@
+# rosters.py
+"""
+Roster slots: which of a team's players start at F, D and G and which sit on
+the bench, for every team at once.
+
+A player's rank within (team, position), in the players' order, decides the
+slot: the first ROSTER_TEMPLATE[pos] start and the rest go to the bench in
+the order they come. This is one grouped cumulative count over all teams,
+so 1,000 rosters cost about what one does.
+"""
+import numpy as np
+import pandas as pd
+
+ROSTER_TEMPLATE = {"F": 6, "D": 4, "G": 2}
+BENCH_SLOTS = 5
+EMPTY = "---"
+
+STARTING_SLOTS = sum(ROSTER_TEMPLATE.values())
+# First starting slot of each position, in template order
+SLOT_OFFSETS = dict(zip(ROSTER_TEMPLATE, np.cumsum([0, *ROSTER_TEMPLATE.values()])))
+
+def slot_labels(bench=BENCH_SLOTS):
+    """The Pos. label of every empty slot of a roster, in slot order."""
+    return [pos for pos, slots in ROSTER_TEMPLATE.items() for _ in range(slots)] + ["Bench"] * bench
+
+def assign_slots(players: pd.DataFrame, team="held_by") -> pd.DataFrame:
+    """
+    The players that have a team, with their roster slot and Pos. relabelled
+    "Bench - <pos>" for bench players, sorted by team and slot. Positions not
+    in the template always sit. Slots are 0..STARTING_SLOTS-1 for starters
+    and count on from STARTING_SLOTS for the bench.
+    """
+    held = players[players[team].notna()]
+    pos = held["Pos."]
+    rank = held.groupby([held[team], pos], sort=False, observed=True).cumcount().to_numpy()
+    starts = rank < pos.map(ROSTER_TEMPLATE).to_numpy()
+    bench_rank = held.groupby([held[team], starts], sort=False, observed=True).cumcount().to_numpy()
+    slot = np.where(starts, pos.map(SLOT_OFFSETS).fillna(0).to_numpy() + rank, STARTING_SLOTS + bench_rank).astype(np.int64)
+    assigned = held.assign(**{"slot": slot, "Pos.": np.where(starts, pos, "Bench - " + pos.astype(str))})
+    # Integer sort: team codes follow the sorted team names
+    codes, _ = pd.factorize(held[team], sort=True)
+    return assigned.iloc[np.lexsort((slot, codes))]
+
+def build_rosters(players: pd.DataFrame, columns, teams=None, bench=BENCH_SLOTS, team="held_by") -> pd.DataFrame:
+    """
+    Every team's roster table, indexed by (team, slot): Pos. and columns for
+    each of the template's slots and `bench` bench slots, EMPTY where no
+    player fills one. Players beyond the bench are listed after it rather
+    than dropped. teams defaults to the teams holding players, sorted.
+    """
+    assigned = assign_slots(players[list(dict.fromkeys([team, "Pos.", *columns]))], team)
+    teams = pd.Index(sorted(assigned[team].unique()) if teams is None else list(teams))
+    codes = teams.get_indexer(assigned[team])
+    assigned = assigned[codes >= 0]
+    codes = codes[codes >= 0]
+    slot = assigned["slot"].to_numpy()
+
+    # One block of rows per team: its template and bench slots, plus overflow
+    labels = np.array(slot_labels(bench), dtype=object)
+    sizes = np.full(len(teams), len(labels), dtype=np.int64)
+    np.maximum.at(sizes, codes, slot + 1)
+    offsets = np.cumsum(sizes) - sizes
+    row_team = np.repeat(np.arange(len(teams)), sizes)
+    row_slot = np.arange(sizes.sum()) - offsets[row_team]
+    rows = offsets[codes] + slot
+    filled = np.zeros(len(row_slot), dtype=bool)
+    filled[rows] = True
+
+    data = {}
+    for col in ["Pos.", *columns]:
+        values = assigned[col].to_numpy()
+        if filled.all():
+            out = np.empty(len(row_slot), dtype=values.dtype)
+        elif col == "Pos.":
+            out = np.where(row_slot < len(labels), labels[np.minimum(row_slot, len(labels) - 1)], "Bench").astype(object)
+        else:
+            # Empty slots hold EMPTY, so keep values as they are (no int -> float)
+            out = np.full(len(row_slot), EMPTY, dtype=object)
+        out[rows] = values
+        data[col] = out
+    index = pd.MultiIndex.from_arrays([teams.to_numpy(dtype=object)[row_team], row_slot], names=[team, "slot"])
+    return pd.DataFrame(data, index=index)
+
+def build_roster(players: pd.DataFrame, team_name, columns, bench=BENCH_SLOTS, team="held_by") -> pd.DataFrame:
+    """One team's roster table, as build_rosters lays it out, indexed 0..n."""
+    return build_rosters(players[players[team] == team_name], columns, [team_name], bench, team).reset_index(drop=True)
@@ -0,0 +1,54 @@
+# scoring.py
+"""
+Fantasy scoring rules and the scoring engine.
+SCORING_RULES is the single source for both the Home page breakdown and the
+points computed by the Commissioner tools.
+"""
+import numpy as np
+import pandas as pd
+
+# (stat column, description, points per unit)
+SCORING_RULES = [
+    ("G", "Goals", 2),
+    ("A", "Assists", 1),
+    ("Shots", "Shots", 0.1),
+    ("PIM", "Penalty minutes", -0.3),
+    ("GWG", "Game Winning Goals", 1),
+    ("PPG", "Power Play Goals", 0.5),
+    ("SHG", "Short Handed Goals", 1),
+    ("+/-", "+/-", 0.5),
+    ("FOW", "Faceoffs Won", 0.1),
+    ("FOL", "Faceoffs Lost", -0.1),
+    ("BLK", "Blocked Shots", 0.5),
+    ("W", "Wins (for goalies)", 4),
+    ("GA", "Goals Against", -2),
+    ("SV", "Saves", 0.2),
+    ("SO", "Shutouts", 3),
+]
+
+SCORED_STATS = [stat for stat, _, _ in SCORING_RULES]
+WEIGHTS = np.array([points for _, _, points in SCORING_RULES], dtype=np.float64)
+
+def describe_points(points):
+    """Home page wording for a rule, e.g. '2 pts each' or '1 pt each'."""
+    unit = "pt" if abs(points) == 1 else "pts"
+    return f"{points:g} {unit} each"
+
+def score_array(stats):
+    """
+    Score a float array whose last axis is SCORED_STATS, in one matrix-vector
+    product. Any leading shape works: (players,), (days, players), ...
+    """
+    stats = np.nan_to_num(np.asarray(stats, dtype=np.float64))
+    return np.round(stats @ WEIGHTS, 1)
+
+def compute_fantasy_points(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of a stats frame with a FantasyPoints column.
+    Rows can be anything (players, player-days, a whole season); stat columns
+    that are missing score zero and unscored columns such as GP are ignored.
+    """
+    stats = data.reindex(columns=SCORED_STATS, fill_value=0).to_numpy(dtype=np.float64)
+    scored = data.copy()
+    scored['FantasyPoints'] = score_array(stats)
+    return scored
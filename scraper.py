@@ -0,0 +1,289 @@
+# scraper.py
+"""
+Scrapes season stats from collegehockeyinc.com for the Commissioner tools.
+Team pages are downloaded through a swappable fetcher and each page is
+parsed exactly once; pipeline.py runs the teams concurrently.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+import pandas as pd
+
+BASE_URL = "https://collegehockeyinc.com"
+TEAMS_URL = f"{BASE_URL}/teams"
+STATS_PAGE = "stats26-overall.php"
+STATS_COLS = ['GP', 'G', 'A', 'Shots', 'PIM', 'GWG', 'PPG', 'SHG', '+/-', 'FOW', 'FOL', 'BLK', 'W', 'GA', 'SV', 'SO']
+
+# --- Connection limits ---
+MAX_CONNECTIONS = 8        # concurrent downloads overall
+PER_HOST_CONNECTIONS = 4   # concurrent downloads to any one host
+PER_HOST_INTERVAL = 0.1    # seconds between request starts to the same host
+
+# --- On-disk page cache (set FHL_PAGE_CACHE to an empty string to disable) ---
+PAGE_CACHE_DIR = os.environ.get("FHL_PAGE_CACHE", ".cache/pages")
+
+def team_stats_url(team):
+    return f"{BASE_URL}/teams/{team}/{STATS_PAGE}"
+
+
+# --- Fetchers ---
+class _HostGate:
+    """Caps concurrent requests to one host and spaces out their start times."""
+
+    def __init__(self, connections, interval):
+        self.slots = threading.Semaphore(connections)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait_turn(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+class Fetcher:
+    """A source of pages: fetch() returns the HTML, fetch_tables() its parsed tables."""
+
+    def fetch(self, url) -> str:
+        raise NotImplementedError
+
+    def fetch_tables(self, url):
+        return read_tables(self.fetch(url))
+
+class HttpFetcher(Fetcher):
+    """Downloads pages over one shared connection pool, politely per host."""
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_host=PER_HOST_CONNECTIONS,
+                 interval=PER_HOST_INTERVAL, timeout=30):
+        self.client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            follow_redirects=True,
+        )
+        self.per_host = per_host
+        self.interval = interval
+        self._gates = {}
+        self._lock = threading.Lock()
+
+    def _gate(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._gates:
+                self._gates[host] = _HostGate(self.per_host, self.interval)
+            return self._gates[host]
+
+    def get(self, url, headers=None) -> httpx.Response:
+        gate = self._gate(url)
+        with gate.slots:
+            gate.wait_turn()
+            return self.client.get(url, headers=headers)
+
+    def fetch(self, url) -> str:
+        response = self.get(url)
+        response.raise_for_status()
+        return response.text
+
+class CachingFetcher(HttpFetcher):
+    """
+    HttpFetcher backed by a PageCache. Revalidates cached pages with
+    If-None-Match / If-Modified-Since; on 304 the tables parsed last time are
+    returned without downloading or parsing the page again.
+    """
+
+    def __init__(self, cache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def _revalidate(self, url):
+        """Return (entry, response); response is None when the cached copy is current."""
+        entry = self.cache.lookup(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.get(url, headers=headers)
+        if response.status_code == 304 and entry:
+            return entry, None
+        response.raise_for_status()
+        entry = self.cache.store(url, response)
+        return entry, response
+
+    def fetch(self, url) -> str:
+        entry, response = self._revalidate(url)
+        if response is None:
+            return self.cache.body(entry["digest"])
+        return response.text
+
+    def fetch_tables(self, url):
+        entry, response = self._revalidate(url)
+        tables = self.cache.tables(entry["digest"])
+        if tables is None:
+            html = response.text if response is not None else self.cache.body(entry["digest"])
+            tables = read_tables(html)
+            self.cache.store_tables(entry["digest"], tables)
+        return tables
+
+class PageCache:
+    """
+    Content-addressed store for downloaded pages.
+    Bodies and their parsed tables are filed under the SHA-256 of the body;
+    index.json maps each URL to its digest, ETag and Last-Modified. Files of
+    digests the index no longer refers to are deleted, so the cache holds one
+    version of each page.
+    """
+
+    def __init__(self, directory=PAGE_CACHE_DIR):
+        self.directory = Path(directory)
+        (self.directory / "bodies").mkdir(parents=True, exist_ok=True)
+        (self.directory / "parsed").mkdir(parents=True, exist_ok=True)
+        self._index_path = self.directory / "index.json"
+        self._lock = threading.Lock()
+        try:
+            self._index = json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._index = {}
+        self._sweep()
+
+    def _files(self, digest):
+        return self.directory / "bodies" / f"{digest}.html", self.directory / "parsed" / f"{digest}.pkl"
+
+    def _sweep(self):
+        """Delete files left by digests the index dropped (or by writes that never finished)."""
+        referenced = {entry["digest"] for entry in self._index.values()}
+        for path in [*(self.directory / "bodies").iterdir(), *(self.directory / "parsed").iterdir()]:
+            if path.name.split(".")[0] not in referenced or path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+
+    def lookup(self, url):
+        with self._lock:
+            entry = self._index.get(url)
+        if entry and (self.directory / "bodies" / f"{entry['digest']}.html").exists():
+            return entry
+        return None
+
+    def store(self, url, response):
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        entry = {
+            "digest": digest,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        # Under the lock, so a body is never pruned between its write and its index entry
+        with self._lock:
+            path = self._files(digest)[0]
+            if not path.exists():
+                _write_atomic(path, body)
+            previous = self._index.get(url)
+            self._index[url] = entry
+            _write_atomic(self._index_path, json.dumps(self._index, indent=1).encode("utf-8"))
+            if previous and previous["digest"] != digest and all(
+                    other["digest"] != previous["digest"] for other in self._index.values()):
+                for stale in self._files(previous["digest"]):
+                    stale.unlink(missing_ok=True)
+        return entry
+
+    def body(self, digest):
+        return self._files(digest)[0].read_bytes().decode("utf-8", errors="replace")
+
+    def tables(self, digest):
+        try:
+            with open(self._files(digest)[1], "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def store_tables(self, digest, tables):
+        _write_atomic(self._files(digest)[1], pickle.dumps(tables))
+
+def _write_atomic(path, data):
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+class FixtureFetcher(Fetcher):
+    """Serves pages saved in a directory, so the scrape can run offline."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path_for(self, url):
+        name = urlparse(url).path.strip("/").replace("/", "__") or "index"
+        return self.directory / f"{name}.html"
+
+    def fetch(self, url) -> str:
+        return self.path_for(url).read_text(encoding="utf-8")
+
+    def save(self, url, html):
+        path = self.path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+
+def default_fetcher():
+    """
+    FixtureFetcher when FHL_SCRAPER_FIXTURES points at a directory, otherwise
+    a CachingFetcher on PAGE_CACHE_DIR (a plain HttpFetcher if that is empty).
+    """
+    fixtures = os.environ.get("FHL_SCRAPER_FIXTURES")
+    if fixtures:
+        return FixtureFetcher(fixtures)
+    if PAGE_CACHE_DIR:
+        return CachingFetcher(PageCache(PAGE_CACHE_DIR))
+    return HttpFetcher()
+
+
+# --- Parsing ---
+def read_tables(html):
+    return pd.read_html(StringIO(html))
+
+def parse_team_names(tables):
+    college_teams = tables[0]
+    college_teams = college_teams['Name'].drop([0, 1, 5, 59]).dropna().reset_index(drop=True)
+    return pd.DataFrame(college_teams)
+
+def parse_team_stats(tables, team):
+    """Cumulative season stats from one team's page tables, indexed by (Name, team)."""
+    offense = tables[0]['Scoring']
+    goalies = tables[1]['Goaltending']
+
+    offense = offense[offense['Name, Yr'] != 'TOTAL'].copy()
+    goalies = goalies[goalies['Name, Yr'] != 'TOTALS'].copy()
+
+    offense[['Name', 'Pos.', 'Yr']] = offense['Name, Yr'].str.split(',', expand=True)
+    goalies[['Name', 'Yr']] = goalies['Name, Yr'].str.split(',', expand=True)
+
+    points = pd.merge(offense, goalies, on=['Name', 'Yr', 'GP'], how='outer')
+    points = points.drop(['Name, Yr_x', 'Name, Yr_y'], axis=1)
+    points['team'] = team
+    points = points.set_index(['Name', 'team'])
+
+    return points[STATS_COLS].fillna(0)
+
+
+# --- Scraping ---
+def get_team_names(fetcher=None):
+    fetcher = fetcher or default_fetcher()
+    return parse_team_names(fetcher.fetch_tables(TEAMS_URL))
+
+def scrape_team(fetcher, team):
+    return parse_team_stats(fetcher.fetch_tables(team_stats_url(team)), team)
+
+def record_fixtures(directory, teams, fetcher=None):
+    """Save the team list and every team's stats page for FixtureFetcher."""
+    fetcher = fetcher or HttpFetcher()
+    fixtures = FixtureFetcher(directory)
+    for url in [TEAMS_URL] + [team_stats_url(team) for team in teams]:
+        fixtures.save(url, fetcher.fetch(url))
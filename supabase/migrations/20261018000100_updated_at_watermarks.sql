@@ -0,0 +1,27 @@
+-- Last-modified watermark for the incremental (delta) syncs in db_utils.
+-- Every insert or update stamps the row, so a client can ask for
+-- "rows changed since <watermark>" instead of reloading the table.
+
+alter table public.players add column if not exists updated_at timestamptz not null default now();
+alter table public."DraftBoard" add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.touch_updated_at() returns trigger
+language plpgsql as $$
+begin
+  new.updated_at := clock_timestamp();
+  return new;
+end;
+$$;
+
+drop trigger if exists players_touch_updated_at on public.players;
+create trigger players_touch_updated_at
+  before insert or update on public.players
+  for each row execute function public.touch_updated_at();
+
+drop trigger if exists draftboard_touch_updated_at on public."DraftBoard";
+create trigger draftboard_touch_updated_at
+  before insert or update on public."DraftBoard"
+  for each row execute function public.touch_updated_at();
+
+create index if not exists players_updated_at_idx on public.players (updated_at);
+create index if not exists draftboard_updated_at_idx on public."DraftBoard" (updated_at);
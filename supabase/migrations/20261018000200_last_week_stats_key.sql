@@ -0,0 +1,4 @@
+-- Key last_week_stats by player so the scoring pipeline can upsert one
+-- college team's baseline at a time (on_conflict = "Name,team").
+create unique index if not exists last_week_stats_name_team_key
+  on public.last_week_stats ("Name", team);
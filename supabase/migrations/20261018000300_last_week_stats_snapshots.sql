@@ -0,0 +1,32 @@
+-- Versioned snapshots for the last_week_stats baseline.
+--
+-- Each row is valid for the snapshot versions valid_from <= v < valid_to
+-- (valid_to null = still current). A writer stages version current + 1 by
+-- closing the rows that changed (valid_to = new) and inserting their
+-- replacements (valid_from = new); neither is visible until the single-row
+-- update of snapshots.version flips readers over. Unchanged rows are never
+-- rewritten.
+
+alter table public.last_week_stats add column if not exists valid_from integer not null default 0;
+alter table public.last_week_stats add column if not exists valid_to integer;
+
+drop index if exists public.last_week_stats_name_team_key;
+create unique index if not exists last_week_stats_version_key
+  on public.last_week_stats ("Name", team, valid_from);
+create index if not exists last_week_stats_valid_to_idx
+  on public.last_week_stats (valid_to);
+
+create table if not exists public.snapshots (
+  name text primary key,
+  version integer not null
+);
+insert into public.snapshots (name, version) values ('last_week_stats', 0)
+  on conflict (name) do nothing;
+
+-- Readers load the current version with one query against this view.
+create or replace view public.last_week_stats_current as
+  select s.*
+  from public.last_week_stats s
+  join public.snapshots p on p.name = 'last_week_stats'
+  where s.valid_from <= p.version
+    and (s.valid_to is null or s.valid_to > p.version);
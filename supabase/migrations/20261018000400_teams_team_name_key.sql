@@ -0,0 +1,2 @@
+-- Lets save_standings upsert every team's record in one request (on_conflict = team_name).
+create unique index if not exists teams_team_name_key on public.teams (team_name);
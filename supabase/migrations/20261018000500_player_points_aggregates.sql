@@ -0,0 +1,30 @@
+-- Per-player points aggregates maintained by db_utils.save_weekly_points,
+-- so pages read a row per player (per week) instead of the full points history.
+
+create table if not exists public.player_week_points (
+  "Name" text not null,
+  team text not null,
+  "Week" integer not null,
+  "WeeklyPts" double precision not null default 0,
+  primary key ("Name", team, "Week")
+);
+
+create table if not exists public.player_season_points (
+  "Name" text not null,
+  team text not null,
+  "CumulativePts" double precision not null default 0,
+  primary key ("Name", team)
+);
+
+-- Backfill from the points already saved.
+insert into public.player_week_points ("Name", team, "Week", "WeeklyPts")
+  select "Name", team, "Week", sum("FantasyPoints")
+  from public.points
+  group by "Name", team, "Week"
+on conflict ("Name", team, "Week") do update set "WeeklyPts" = excluded."WeeklyPts";
+
+insert into public.player_season_points ("Name", team, "CumulativePts")
+  select "Name", team, sum("FantasyPoints")
+  from public.points
+  group by "Name", team
+on conflict ("Name", team) do update set "CumulativePts" = excluded."CumulativePts";
@@ -0,0 +1,3 @@
+-- Lets the season recompute upsert only the matchups whose scores changed.
+create unique index if not exists matchups_week_teams_key
+  on public.matchups (week, home_team, away_team);
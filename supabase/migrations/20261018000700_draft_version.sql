@@ -0,0 +1,26 @@
+-- Change feed for the Draft room.
+--
+-- snapshots row 'draft' counts changes to the draft: every written DraftBoard
+-- row and every change of a player's held_by moves it forward. Clients poll
+-- this one row and only reload (incrementally, by updated_at) when it moved.
+
+insert into public.snapshots (name, version) values ('draft', 0)
+  on conflict (name) do nothing;
+
+create or replace function public.bump_draft_version() returns trigger
+language plpgsql as $$
+begin
+  update public.snapshots set version = version + 1 where name = 'draft';
+  return null;
+end;
+$$;
+
+drop trigger if exists draftboard_bump_draft_version on public."DraftBoard";
+create trigger draftboard_bump_draft_version
+  after insert or update or delete on public."DraftBoard"
+  for each row execute function public.bump_draft_version();
+
+drop trigger if exists players_bump_draft_version on public.players;
+create trigger players_bump_draft_version
+  after insert or delete or update of held_by on public.players
+  for each row execute function public.bump_draft_version();
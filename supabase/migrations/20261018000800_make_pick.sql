@@ -0,0 +1,49 @@
+-- One-round-trip, atomic draft pick.
+--
+-- make_pick checks, inside one transaction, that (p_round, p_pick) is the
+-- next open slot and belongs to p_fantasy_team, and that the player is still
+-- undrafted; only then does it set players.held_by and fill the board slot.
+-- The slot row is locked first, so a second pick of the same slot waits and
+-- then finds it filled; the held_by update only matches an undrafted player,
+-- so two teams can never hold the same one. Rejections use their own
+-- SQLSTATEs: DP001 (not this team's turn) and DP002 (player not available).
+
+create or replace function public.make_pick(
+  p_round integer,
+  p_pick integer,
+  p_fantasy_team text,
+  p_name text,
+  p_team text
+) returns setof public."DraftBoard"
+language plpgsql as $$
+declare
+  slot public."DraftBoard";
+  player_pos text;
+begin
+  select * into slot from public."DraftBoard"
+    where "Round" = p_round and "Pick" = p_pick
+    for update;
+  if not found
+     or slot."Name" is not null
+     or slot."FantasyTeam" is distinct from p_fantasy_team
+     or exists (select 1 from public."DraftBoard" b
+                where b."Name" is null and (b."Round", b."Pick") < (p_round, p_pick)) then
+    raise exception 'round %, pick % is not % to make', p_round, p_pick, p_fantasy_team
+      using errcode = 'DP001';
+  end if;
+
+  update public.players set held_by = p_fantasy_team
+    where "Name" = p_name and team = p_team and held_by is null
+    returning "Pos." into player_pos;
+  if not found then
+    raise exception '% (%) is not available', p_name, p_team
+      using errcode = 'DP002';
+  end if;
+
+  return query
+    update public."DraftBoard"
+      set "Name" = p_name, team = p_team, "Pos." = player_pos
+      where "Round" = p_round and "Pick" = p_pick
+      returning *;
+end;
+$$;
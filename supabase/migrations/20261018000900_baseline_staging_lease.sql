@@ -0,0 +1,10 @@
+-- Staging lease for last_week_stats snapshots.
+--
+-- Only one run may stage the next baseline version at a time: a run claims
+-- the lease (staged_by = its run id) on the snapshots row before it discards
+-- leftovers or writes anything, and its commit only flips the version while
+-- it still holds the lease. A lease older than the client's timeout is
+-- presumed abandoned and can be taken over.
+
+alter table public.snapshots add column if not exists staged_by text;
+alter table public.snapshots add column if not exists staged_at timestamptz;
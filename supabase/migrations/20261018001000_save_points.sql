@@ -0,0 +1,48 @@
+-- Points and their per-player aggregates, written in one transaction.
+--
+-- save_points upserts a batch of daily points rows and moves the matching
+-- player_week_points and player_season_points rows by the difference from
+-- what was saved for those (Name, team, Week, Day) keys before, as
+-- increments in the same statement. A failed call changes nothing, so the
+-- aggregates cannot drift from points, and replaying a batch adds nothing.
+-- Calls take a transaction-scoped advisory lock, so overlapping runs apply
+-- their differences one after the other instead of both reading the same
+-- old points.
+
+create or replace function public.save_points(p_rows jsonb) returns integer
+language plpgsql as $$
+declare
+  saved integer;
+begin
+  perform pg_advisory_xact_lock(hashtext('public.save_points'));
+
+  with incoming as (
+    select * from jsonb_to_recordset(p_rows)
+      as r("Name" text, team text, "Week" integer, "Day" integer, "FantasyPoints" double precision)
+  ),
+  delta as (
+    select i."Name", i.team, i."Week", sum(i."FantasyPoints" - coalesce(p."FantasyPoints", 0)) as pts
+    from incoming i
+    left join public.points p using ("Name", team, "Week", "Day")
+    group by i."Name", i.team, i."Week"
+  ),
+  upserted as (
+    insert into public.points ("Name", team, "Week", "Day", "FantasyPoints")
+      select "Name", team, "Week", "Day", "FantasyPoints" from incoming
+    on conflict ("Name", team, "Week", "Day") do update set "FantasyPoints" = excluded."FantasyPoints"
+    returning 1
+  ),
+  weekly as (
+    insert into public.player_week_points as w ("Name", team, "Week", "WeeklyPts")
+      select "Name", team, "Week", pts from delta where pts <> 0
+    on conflict ("Name", team, "Week") do update set "WeeklyPts" = w."WeeklyPts" + excluded."WeeklyPts"
+  ),
+  season as (
+    insert into public.player_season_points as s ("Name", team, "CumulativePts")
+      select "Name", team, sum(pts) from delta group by "Name", team having sum(pts) <> 0
+    on conflict ("Name", team) do update set "CumulativePts" = s."CumulativePts" + excluded."CumulativePts"
+  )
+  select count(*) into saved from upserted;
+  return saved;
+end;
+$$;
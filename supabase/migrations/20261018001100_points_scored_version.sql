@@ -0,0 +1,61 @@
+-- Rescoring a day after a stat correction adds to its points.
+--
+-- Weekly scoring diffs the scraped stats against the current baseline, so a
+-- second run for the same Week and Day (after the first one moved the
+-- baseline forward) only yields what changed since. points.scored_version
+-- is the baseline version a row was scored up to: save_points adds the
+-- incoming points to a row scored up to another version and replaces the
+-- row when the version matches, i.e. when the same run (or its retry after
+-- a failure, which stages the same version again) writes it once more.
+-- Rows sent without a version replace, as before.
+
+alter table public.points add column if not exists scored_version integer;
+
+create or replace function public.save_points(p_rows jsonb) returns integer
+language plpgsql as $$
+declare
+  saved integer;
+begin
+  perform pg_advisory_xact_lock(hashtext('public.save_points'));
+
+  with incoming as (
+    select * from jsonb_to_recordset(p_rows)
+      as r("Name" text, team text, "Week" integer, "Day" integer, "FantasyPoints" double precision,
+           scored_version integer)
+  ),
+  merged as (
+    select i."Name", i.team, i."Week", i."Day", i.scored_version,
+           coalesce(p."FantasyPoints", 0) as old,
+           case when p."FantasyPoints" is null or i.scored_version is null
+                     or p.scored_version is not distinct from i.scored_version
+                then i."FantasyPoints"
+                else p."FantasyPoints" + i."FantasyPoints" end as pts
+    from incoming i
+    left join public.points p using ("Name", team, "Week", "Day")
+  ),
+  delta as (
+    select "Name", team, "Week", sum(pts - old) as pts
+    from merged
+    group by "Name", team, "Week"
+  ),
+  upserted as (
+    insert into public.points ("Name", team, "Week", "Day", "FantasyPoints", scored_version)
+      select "Name", team, "Week", "Day", pts, scored_version from merged
+    on conflict ("Name", team, "Week", "Day") do update
+      set "FantasyPoints" = excluded."FantasyPoints", scored_version = excluded.scored_version
+    returning 1
+  ),
+  weekly as (
+    insert into public.player_week_points as w ("Name", team, "Week", "WeeklyPts")
+      select "Name", team, "Week", pts from delta where pts <> 0
+    on conflict ("Name", team, "Week") do update set "WeeklyPts" = w."WeeklyPts" + excluded."WeeklyPts"
+  ),
+  season as (
+    insert into public.player_season_points as s ("Name", team, "CumulativePts")
+      select "Name", team, sum(pts) from delta group by "Name", team having sum(pts) <> 0
+    on conflict ("Name", team) do update set "CumulativePts" = s."CumulativePts" + excluded."CumulativePts"
+  )
+  select count(*) into saved from upserted;
+  return saved;
+end;
+$$;